@@ -1,24 +1,23 @@
-import openai
 import os
 import sys
-import requests
-from PIL import Image
-import io
 import logging
-from dotenv import load_dotenv
 from typing import Optional, Dict, Any
-import torch
-import torch.nn as nn
-from torchvision import models, transforms
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Ajouter le chemin source pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Aucune dépendance lourde (torch, openai) n'est importée au chargement de ce module
+from src.client import ClientServeurMedical
+
 class AssistantMedicalGPT:
     def __init__(self):
         # Charger la configuration
         self._load_config()
+        self.serveur = ClientServeurMedical()
         
         # Initialiser le client OpenAI si disponible
         self.use_gpt4 = False
@@ -26,6 +25,8 @@ class AssistantMedicalGPT:
         
         if self.openai_api_key and self.openai_api_key != 'votre_cle_api_openai_ici':
             try:
+                # Import différé : openai n'est chargé que si une clé est configurée
+                import openai
                 self.client = openai.OpenAI(api_key=self.openai_api_key)
                 self.use_gpt4 = True
                 logger.info("✅ GPT-4 disponible pour informations générales")
@@ -61,6 +62,8 @@ DOMAINES D'EXPERTISE:
 
     def _load_config(self):
         """Charge la configuration depuis les variables d'environnement"""
+        from dotenv import load_dotenv
+
         env_file = '.env' if os.path.exists('.env') else '.env.example'
         load_dotenv(env_file)
         
@@ -74,11 +77,9 @@ DOMAINES D'EXPERTISE:
         Analyse une image via le serveur de classification
         """
         try:
-            files = {"file": ("image.jpg", image_bytes, "image/jpeg")}
-            response = requests.post("http://localhost:8000/predict", files=files)
+            status_code, result = self.serveur.analyser_image(image_bytes)
             
-            if response.status_code == 200:
-                result = response.json()
+            if status_code == 200:
                 if result['status'] == 'success':
                     reponse_base = self._construire_reponse_locale(result, question_utilisateur)
                     
@@ -103,7 +104,7 @@ DOMAINES D'EXPERTISE:
                 else:
                     return f"❌ Erreur lors de l'analyse: {result.get('error', 'Erreur inconnue')}"
             else:
-                return f"❌ Erreur serveur: {response.status_code}"
+                return f"❌ Erreur serveur: {status_code}"
                 
         except Exception as e:
             logger.error(f"❌ Erreur analyse image: {e}")
@@ -0,0 +1,7 @@
+"""
+Client HTTP léger du serveur de classification (sans dépendance à torch)
+"""
+
+from .client_medical import ClientServeurMedical
+
+__all__ = ["ClientServeurMedical"]
@@ -0,0 +1,40 @@
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ClientServeurMedical:
+    """
+    Accès au serveur de classification. Seule la bibliothèque standard est importée
+    au chargement du module : `requests` n'est importé qu'au premier appel.
+    """
+
+    def __init__(self, base_url: str = None, timeout: float = 30):
+        self.base_url = (base_url or os.getenv('MCP_SERVER_URL', 'http://localhost:8000')).rstrip('/')
+        self.timeout = timeout
+
+    def verifier_sante(self) -> bool:
+        """Indique si le serveur répond sur /health"""
+        import requests
+
+        try:
+            response = requests.get(f"{self.base_url}/health", timeout=5)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def analyser_image(self, image_bytes: bytes, filename: str = "image.jpg",
+                       content_type: str = "image/jpeg", priority: str = "interactive"):
+        """
+        Envoie une image à /predict.
+        Retourne (code HTTP, corps JSON ou None si la réponse n'est pas du JSON).
+        """
+        import requests
+
+        files = {"file": (filename, image_bytes, content_type)}
+        response = requests.post(f"{self.base_url}/predict", files=files,
+                                 headers={"X-Priority": priority}, timeout=self.timeout)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
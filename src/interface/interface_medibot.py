@@ -5,14 +5,19 @@ from PIL import Image
 import io
 import logging
 import base64
-import requests
 
 # Configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Ajouter le chemin source pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.client import ClientServeurMedical
+
 class InterfaceMediBot:
     def __init__(self):
+        self.serveur = ClientServeurMedical()
         self._initialiser_page()
         self._initialiser_session()
 
@@ -109,13 +114,9 @@ class InterfaceMediBot:
             st.header("🔧 État du Système")
             
             # Test de connexion au serveur
-            try:
-                response = requests.get("http://localhost:8000/health")
-                if response.status_code == 200:
-                    st.success("✅ Serveur de classification connecté")
-                else:
-                    st.error("❌ Serveur de classification hors ligne")
-            except:
+            if self.serveur.verifier_sante():
+                st.success("✅ Serveur de classification connecté")
+            else:
                 st.error("❌ Serveur de classification non accessible")
                 st.info("Démarrez le serveur avec: python serveur_medical.py")
 
@@ -189,11 +190,9 @@ class InterfaceMediBot:
     def _analyser_image_avec_serveur(self, image_bytes: bytes) -> str:
         """Envoie l'image au serveur pour analyse"""
         try:
-            files = {"file": ("image.jpg", image_bytes, "image/jpeg")}
-            response = requests.post("http://localhost:8000/predict", files=files)
+            status_code, result = self.serveur.analyser_image(image_bytes)
             
-            if response.status_code == 200:
-                result = response.json()
+            if status_code == 200:
                 if result['status'] == 'success':
                     return f"""
 📊 RÉSULTAT DE L'ANALYSE
@@ -217,7 +216,7 @@ Consultez toujours un médecin qualifié pour toute décision médicale.
                 else:
                     return f"❌ Erreur lors de l'analyse: {result.get('error', 'Erreur inconnue')}"
             else:
-                return f"❌ Erreur serveur: {response.status_code}"
+                return f"❌ Erreur serveur: {status_code}"
                 
         except Exception as e:
             return f"❌ Erreur de connexion au serveur: {str(e)}"
@@ -2,6 +2,14 @@
 Module serveur MCP pour la classification médicale
 """
 
-from .serveur_medical import app, classifier
 
-_all_ = ["app", "classifier"]
\ No newline at end of file
+def __getattr__(name):
+    # Import différé : les sous-modules (auto-réglage, ...) restent importables
+    # sans charger le modèle, y compris quand serveur_medical.py est lancé en script.
+    if name in ("app", "classifier"):
+        from . import serveur_medical
+        return getattr(serveur_medical, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_all_ = ["app", "classifier"]
@@ -0,0 +1,192 @@
+"""
+Auto-réglage des paramètres d'exécution du classificateur (threads, batch, format mémoire)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import platform
+import time
+from datetime import datetime
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_PATH = 'models/autotune_profiles.json'
+
+# Taille de lot de /predict/batch en l'absence de profil mesuré
+DEFAULT_BATCH_SIZE = 8
+
+
+def host_signature() -> str:
+    """Construit une signature de l'hôte (CPU, nombre de cœurs, version de torch)"""
+    cpu_model = platform.processor() or platform.machine()
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    cpu_model = line.split(':', 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return f"{platform.system()}|{platform.machine()}|{cpu_model}|{os.cpu_count()}cpu|torch-{torch.__version__}"
+
+
+def model_version(model_path: str) -> str:
+    """Identifie la version du modèle par son nom et l'empreinte de son fichier"""
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return f"{stem}-{digest.hexdigest()[:12]}"
+
+
+def default_profile() -> dict:
+    """Profil correspondant aux réglages par défaut de torch"""
+    return {
+        'num_threads': torch.get_num_threads(),
+        'interop_threads': torch.get_num_interop_threads(),
+        'batch_size': DEFAULT_BATCH_SIZE,
+        'memory_format': 'contiguous',
+        'source': 'default',
+    }
+
+
+class AutoTuner:
+    """
+    Mesure une grille de réglages sur des entrées synthétiques et conserve le meilleur
+    profil par signature d'hôte et version de modèle.
+    """
+
+    def __init__(self, profile_path: str = DEFAULT_PROFILE_PATH, warmup: int = 2, iterations: int = 5,
+                 batch_sizes=(1, 4, 8, 16)):
+        self.profile_path = profile_path
+        self.warmup = warmup
+        self.iterations = iterations
+        self.batch_sizes = batch_sizes
+
+    def _thread_candidates(self):
+        cores = os.cpu_count() or 1
+        candidates = {1, max(1, cores // 2), cores, torch.get_num_threads()}
+        return sorted(c for c in candidates if c <= cores)
+
+    def _load_profiles(self) -> dict:
+        if not os.path.exists(self.profile_path):
+            return {}
+        try:
+            with open(self.profile_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Profils d'auto-réglage illisibles ({self.profile_path}): {e}")
+            return {}
+
+    def _save_profile(self, key: str, profile: dict):
+        profiles = self._load_profiles()
+        profiles[key] = profile
+        directory = os.path.dirname(self.profile_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.profile_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(profiles, f, indent=2)
+        os.replace(tmp_path, self.profile_path)
+
+    def _time_forward(self, model, inputs) -> float:
+        """Temps moyen (secondes) d'une passe avant"""
+        with torch.no_grad():
+            for _ in range(self.warmup):
+                model(inputs)
+            start = time.perf_counter()
+            for _ in range(self.iterations):
+                model(inputs)
+        return (time.perf_counter() - start) / self.iterations
+
+    def benchmark(self, model, device, input_shape=(3, 224, 224)) -> dict:
+        """
+        Mesure la latence unitaire pour chaque (threads, format mémoire), puis le débit
+        par taille de batch avec la meilleure combinaison.
+        """
+        initial_threads = torch.get_num_threads()
+        thread_grid = self._thread_candidates() if device.type == 'cpu' else [initial_threads]
+        results = []
+        best = None
+
+        try:
+            for memory_format in ('contiguous', 'channels_last'):
+                fmt = torch.channels_last if memory_format == 'channels_last' else torch.contiguous_format
+                model.to(memory_format=fmt)
+                sample = torch.randn(1, *input_shape, device=device).contiguous(memory_format=fmt)
+                for num_threads in thread_grid:
+                    torch.set_num_threads(num_threads)
+                    latency = self._time_forward(model, sample)
+                    results.append({'num_threads': num_threads, 'memory_format': memory_format,
+                                    'batch_size': 1, 'latency_ms': latency * 1000})
+                    if best is None or latency < best[0]:
+                        best = (latency, num_threads, memory_format)
+
+            _, num_threads, memory_format = best
+            fmt = torch.channels_last if memory_format == 'channels_last' else torch.contiguous_format
+            model.to(memory_format=fmt)
+            torch.set_num_threads(num_threads)
+
+            best_batch, best_throughput = 1, 0.0
+            for batch_size in self.batch_sizes:
+                batch = torch.randn(batch_size, *input_shape, device=device).contiguous(memory_format=fmt)
+                latency = self._time_forward(model, batch)
+                throughput = batch_size / latency
+                results.append({'num_threads': num_threads, 'memory_format': memory_format,
+                                'batch_size': batch_size, 'latency_ms': latency * 1000,
+                                'images_per_second': throughput})
+                if throughput > best_throughput:
+                    best_batch, best_throughput = batch_size, throughput
+        finally:
+            torch.set_num_threads(initial_threads)
+            model.to(memory_format=torch.contiguous_format)
+
+        return {
+            'num_threads': num_threads,
+            # Une seule passe avant n'exploite pas le parallélisme inter-opérateurs ;
+            # un seul thread évite la contention avec les threads intra-opérateur.
+            'interop_threads': 1 if device.type == 'cpu' else torch.get_num_interop_threads(),
+            'batch_size': best_batch,
+            'memory_format': memory_format,
+            'latency_ms': best[0] * 1000,
+            'images_per_second': best_throughput,
+            'measurements': results,
+            'source': 'benchmark',
+            'created_at': datetime.now().isoformat(),
+        }
+
+    def resolve(self, model, device, version: str, input_shape=(3, 224, 224), force: bool = False) -> dict:
+        """Retourne le profil enregistré pour cet hôte, ou le mesure puis l'enregistre"""
+        key = f"{host_signature()}|{version}|{'x'.join(map(str, input_shape))}"
+        profile = None if force else self._load_profiles().get(key)
+        if profile is not None:
+            logger.info("Profil d'auto-réglage existant réutilisé")
+            return dict(profile, source='cache')
+
+        logger.info("Auto-réglage en cours (première exécution sur cet hôte)...")
+        profile = self.benchmark(model, device, input_shape)
+        profile['host'] = host_signature()
+        profile['model_version'] = version
+        self._save_profile(key, profile)
+        logger.info(f"Profil retenu: {profile['num_threads']} threads, batch {profile['batch_size']}, "
+                    f"{profile['memory_format']}")
+        return profile
+
+
+def apply_profile(model, profile: dict) -> dict:
+    """Applique un profil au processus et au modèle ; le profil reflète ensuite les valeurs effectives"""
+    torch.set_num_threads(profile['num_threads'])
+    try:
+        torch.set_num_interop_threads(profile['interop_threads'])
+    except RuntimeError:
+        # Ne peut être fixé qu'une fois, avant tout travail inter-opérateurs
+        logger.warning("Threads inter-opérateurs déjà initialisés, réglage ignoré")
+    profile['interop_threads'] = torch.get_num_interop_threads()
+    if profile['memory_format'] == 'channels_last':
+        model.to(memory_format=torch.channels_last)
+    return profile
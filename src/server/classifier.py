@@ -0,0 +1,219 @@
+"""
+Classificateur de pneumonie : chargement du modèle, prétraitement et inférence (sans serveur HTTP)
+"""
+
+import io
+import logging
+import os
+import time
+
+import torch
+from PIL import Image
+from torchvision import transforms
+
+from src.server import dicom
+from src.server.autotune import AutoTuner, DEFAULT_PROFILE_PATH, apply_profile, default_profile, model_version
+from src.server.grayscale import fold_grayscale_input
+from src.training.architectures import DEFAULT_ARCHITECTURE, load_model
+
+logger = logging.getLogger(__name__)
+
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+
+
+class PneumoniaClassifier:
+    def __init__(self, model_path: str):
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.model_path = model_path
+        self.grayscale = os.getenv('GRAYSCALE_INPUT', 'true').lower() == 'true'
+        self.architecture = os.getenv('MODEL_ARCH', DEFAULT_ARCHITECTURE)
+        self.model = self._load_model()
+        self.transform = self._get_transforms()
+        self.class_names = ['NORMAL', 'PNEUMONIA']
+        # Mode cascade : seuil de confiance de la passe basse résolution (vide = désactivé)
+        threshold = os.getenv('CASCADE_THRESHOLD', '')
+        self.cascade_threshold = float(threshold) if threshold else None
+        self.low_res = int(os.getenv('CASCADE_LOW_RES', 112))
+        self.low_res_transform = self._get_transforms(self.low_res)
+        self.cascade_stats = {'low_res': 0, 'full_res': 0}
+        self.input_shape = (1 if self.grayscale else 3, 224, 224)
+        self.model_version = model_version(self.model_path) if self.model is not None else None
+        self.runtime_profile = self._configure_runtime()
+        self.batch_size = self.runtime_profile['batch_size']
+        self.memory_format = (torch.channels_last if self.runtime_profile['memory_format'] == 'channels_last'
+                              else torch.contiguous_format)
+        logger.info("Classificateur de pneumonie initialisé")
+
+    def _load_model(self):
+        """Charge le modèle entraîné"""
+        try:
+            if not os.path.exists(self.model_path):
+                logger.error(f"Fichier modèle non trouvé: {self.model_path}")
+                return None
+            
+            logger.info(f"Chargement du modèle depuis: {self.model_path}")
+            
+            # Charger les poids (l'architecture enregistrée dans le checkpoint prime sur MODEL_ARCH)
+            model, self.architecture = load_model(self.model_path, self.device, self.architecture)
+            
+            # Radiographies en niveaux de gris : première convolution et normalisation repliées sur 1 canal
+            if self.grayscale:
+                fold_grayscale_input(model, IMAGENET_MEAN, IMAGENET_STD)
+            
+            model.eval()
+            model.to(self.device)
+            logger.info("Modèle chargé avec succès")
+            return model
+            
+        except Exception as e:
+            logger.error(f"Erreur chargement modèle: {e}")
+            return None
+
+    def _configure_runtime(self) -> dict:
+        """Applique le profil d'auto-réglage (AUTOTUNE=off|auto|force)"""
+        mode = os.getenv('AUTOTUNE', 'off').lower()
+        if self.model is None or mode == 'off':
+            return default_profile()
+        try:
+            tuner = AutoTuner(os.getenv('AUTOTUNE_PROFILE_PATH', DEFAULT_PROFILE_PATH))
+            profile = tuner.resolve(self.model, self.device, self.model_version,
+                                    input_shape=self.input_shape, force=(mode == 'force'))
+            return apply_profile(self.model, profile)
+        except Exception as e:
+            logger.error(f"Erreur auto-réglage, réglages par défaut conservés: {e}")
+            return default_profile()
+
+    def _get_transforms(self, size: int = 224):
+        """Transformations identiques à l'entraînement"""
+        if self.grayscale:
+            # La normalisation est intégrée à conv1 (voir fold_grayscale_input)
+            return transforms.Compose([
+                transforms.Resize((size, size)),
+                transforms.ToTensor()
+            ])
+        return transforms.Compose([
+            transforms.Resize((size, size)),
+            transforms.ToTensor(),
+            transforms.Normalize(IMAGENET_MEAN, IMAGENET_STD)
+        ])
+
+    def predict(self, image_bytes: bytes, timings: dict = None) -> dict:
+        """Prédit sur une image (durées par étape ajoutées à `timings` s'il est fourni)"""
+        try:
+            if self.model is None:
+                return {"error": "Modèle non chargé", "status": "error"}
+
+            # Conversion bytes → image
+            image = self._decode(image_bytes, timings)
+            
+            # Prédiction (en cascade si CASCADE_THRESHOLD est défini)
+            if self.cascade_threshold is not None:
+                return self._predict_cascade([image], timings)[0]
+            return self._forward(self._to_tensor(image, timings).unsqueeze(0), timings)[0]
+            
+        except Exception as e:
+            logger.error(f"Erreur prédiction: {e}")
+            return {'error': str(e), 'status': 'error'}
+
+    def decode_images(self, images_bytes: list) -> list:
+        """Décode chaque image ; les échecs sont remplacés par un résultat d'erreur"""
+        decoded = []
+        for i, image_bytes in enumerate(images_bytes):
+            try:
+                decoded.append(self._decode(image_bytes))
+            except Exception as e:
+                logger.error(f"Erreur prétraitement image {i}: {e}")
+                decoded.append({'error': str(e), 'status': 'error'})
+        return decoded
+
+    def predict_images(self, images: list) -> list:
+        """Prédit sur un lot d'images déjà décodées (une seule passe avant, ou deux en cascade)"""
+        if self.model is None:
+            return [{"error": "Modèle non chargé", "status": "error"} for _ in images]
+        try:
+            if self.cascade_threshold is not None:
+                return self._predict_cascade(images)
+            return self._forward(torch.stack([self.transform(image) for image in images]))
+        except Exception as e:
+            logger.error(f"Erreur prédiction par lot: {e}")
+            return [{'error': str(e), 'status': 'error'} for _ in images]
+
+    def predict_stage(self, images: list, stage: str = 'full_res', timings: dict = None) -> list:
+        """
+        Une seule passe avant, sans cascade, à la résolution d'un étage ('low_res' ou 'full_res').
+        Durée de la passe dans timings['<stage>_inference_ms'] (évaluation hors ligne du mode cascade)
+        """
+        transform = self.low_res_transform if stage == 'low_res' else self.transform
+        batch = torch.stack([transform(image) for image in images])
+        return self._forward(batch, timings, timing_key=f'{stage}_inference_ms')
+
+    def _predict_cascade(self, images: list, timings: dict = None) -> list:
+        """
+        Première passe basse résolution (même réseau, pooling adaptatif) ; seuls les cas
+        dont la confiance est sous le seuil repassent en pleine résolution.
+        """
+        low_res_batch = torch.stack([self.low_res_transform(image) for image in images])
+        results = self._forward(low_res_batch, timings, timing_key='low_res_inference_ms')
+        escalated = [i for i, result in enumerate(results) if result['confidence'] < self.cascade_threshold]
+        for result in results:
+            result['stage'] = 'low_res'
+
+        if escalated:
+            full_batch = torch.stack([self._to_tensor(images[i], timings) for i in escalated])
+            for i, result in zip(escalated, self._forward(full_batch, timings)):
+                result['stage'] = 'full_res'
+                result['low_res_confidence'] = results[i]['confidence']
+                results[i] = result
+
+        self.cascade_stats['full_res'] += len(escalated)
+        self.cascade_stats['low_res'] += len(images) - len(escalated)
+        return results
+
+    def _decode(self, image_bytes: bytes, timings: dict = None):
+        """Décode une image (ou un fichier DICOM) en image PIL au mode attendu par le modèle"""
+        if timings is not None:
+            start = time.perf_counter()
+        if dicom.is_dicom(image_bytes):
+            image = dicom.decode(image_bytes, size=224)
+        else:
+            image = Image.open(io.BytesIO(image_bytes))
+        image = image.convert('L' if self.grayscale else 'RGB')
+        if timings is not None:
+            timings['decode_ms'] = (time.perf_counter() - start) * 1000
+        return image
+
+    def _to_tensor(self, image, timings: dict = None):
+        """Transforme une image décodée en tenseur d'entrée pleine résolution"""
+        if timings is not None:
+            start = time.perf_counter()
+        tensor = self.transform(image)
+        if timings is not None:
+            timings['preprocess_ms'] = (time.perf_counter() - start) * 1000
+        return tensor
+
+    def _forward(self, batch, timings: dict = None, timing_key: str = 'inference_ms') -> list:
+        """Passe avant sur un lot et mise en forme des résultats"""
+        if timings is not None:
+            start = time.perf_counter()
+        batch = batch.to(self.device).contiguous(memory_format=self.memory_format)
+        with torch.no_grad():
+            outputs = self.model(batch)
+            probabilities = torch.nn.functional.softmax(outputs, dim=1)
+            confidences, predictions = torch.max(probabilities, 1)
+        if timings is not None:
+            timings[timing_key] = (time.perf_counter() - start) * 1000
+
+        return [
+            {
+                'prediction': self.class_names[prediction],
+                'confidence': confidence,
+                'probabilities': {
+                    'NORMAL': probs[0],
+                    'PNEUMONIA': probs[1]
+                },
+                'status': 'success'
+            }
+            for prediction, confidence, probs in zip(predictions.tolist(), confidences.tolist(),
+                                                     probabilities.tolist())
+        ]
@@ -0,0 +1,101 @@
+"""
+Lecture DICOM : en-têtes sans pixels, et décodage réduit (fenêtrage VOI/LUT) pour la classification
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+try:
+    import pydicom
+except ImportError:  # dépendance optionnelle
+    pydicom = None
+
+try:
+    # pydicom >= 3 : lecture d'une seule frame sans charger tout le Pixel Data
+    from pydicom.pixels import apply_modality_lut, apply_voi_lut, pixel_array as _read_frame
+except ImportError:
+    try:
+        from pydicom.pixel_data_handlers.util import apply_modality_lut, apply_voi_lut
+    except ImportError:
+        apply_modality_lut = apply_voi_lut = None
+    _read_frame = None
+
+# Tags techniques renvoyés par /dicom/tags (aucun identifiant patient)
+TAGS = [
+    'SOPInstanceUID', 'StudyInstanceUID', 'SeriesInstanceUID', 'Modality', 'BodyPartExamined',
+    'ViewPosition', 'StudyDate', 'Manufacturer', 'Rows', 'Columns', 'NumberOfFrames',
+    'BitsStored', 'PhotometricInterpretation', 'SamplesPerPixel', 'WindowCenter', 'WindowWidth',
+    'RescaleSlope', 'RescaleIntercept'
+]
+
+
+def dicom_available() -> bool:
+    return pydicom is not None
+
+
+def is_dicom(data: bytes) -> bool:
+    """Fichier DICOM Part 10 : préambule de 128 octets suivi de 'DICM'"""
+    return len(data) >= 132 and data[128:132] == b'DICM'
+
+
+def _header(data: bytes):
+    if pydicom is None:
+        raise RuntimeError("pydicom n'est pas installé (pip install pydicom)")
+    return pydicom.dcmread(io.BytesIO(data), stop_before_pixels=True)
+
+
+def read_tags(data: bytes) -> dict:
+    """Lit les en-têtes sans lire les données pixel"""
+    header = _header(data)
+    tags = {}
+    for keyword in TAGS:
+        value = header.get(keyword)
+        if value is None:
+            continue
+        if isinstance(value, pydicom.multival.MultiValue):
+            value = [str(v) for v in value]
+        elif not isinstance(value, (int, float)):
+            value = str(value)
+        tags[keyword] = value
+    tags['TransferSyntaxUID'] = str(header.file_meta.get('TransferSyntaxUID', ''))
+    return tags
+
+
+def _block_mean(frame: np.ndarray, factor: int) -> np.ndarray:
+    """Moyenne par blocs factor x factor en arithmétique entière (sans copie flottante pleine résolution)"""
+    if factor <= 1:
+        return frame
+    rows, cols = frame.shape[0] // factor * factor, frame.shape[1] // factor * factor
+    blocks = frame[:rows, :cols].reshape(rows // factor, factor, cols // factor, factor, *frame.shape[2:])
+    return blocks.sum(axis=(1, 3), dtype=np.int64) // (factor * factor)
+
+
+def decode(data: bytes, size: int = 224) -> Image.Image:
+    """
+    Décode la première frame en image 'L' dont le plus petit côté reste >= size.
+    La réduction est faite sur les valeurs stockées ; les LUT de modalité et VOI
+    (fenêtrage) ne sont appliquées qu'à l'image réduite.
+    """
+    header = _header(data)
+    if _read_frame is not None:
+        frame = _read_frame(io.BytesIO(data), index=0)
+    else:
+        frame = pydicom.dcmread(io.BytesIO(data)).pixel_array
+        if int(header.get('NumberOfFrames', 1) or 1) > 1:
+            frame = frame[0]
+
+    factor = max(1, min(frame.shape[0], frame.shape[1]) // size)
+    reduced = _block_mean(frame, factor)
+    if reduced.ndim == 3:
+        # Couleur (rare en radiographie) : luminance
+        reduced = reduced @ np.array([299, 587, 114]) // 1000
+
+    values = apply_voi_lut(apply_modality_lut(reduced, header), header).astype(np.float32)
+    low, high = float(values.min()), float(values.max())
+    pixels = (values - low) * (255.0 / (high - low)) if high > low else np.zeros_like(values)
+    pixels = pixels.round().astype(np.uint8)
+    if header.get('PhotometricInterpretation') == 'MONOCHROME1':
+        pixels = 255 - pixels
+    return Image.fromarray(pixels)
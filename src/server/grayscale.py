@@ -0,0 +1,70 @@
+"""
+Repliement de la première convolution de ResNet pour une entrée en niveaux de gris
+"""
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+class GrayscaleStem(nn.Module):
+    """
+    Remplace une convolution à 3 canaux précédée d'une normalisation par canal.
+
+    Pour une image grise g (dans [0, 1]) répliquée sur les 3 canaux :
+        conv(W, (g - m) / s) = conv(sum_c W_c / s_c, g) + conv(sum_c -W_c m_c / s_c, 1)
+    Le second terme ne dépend que de la taille d'entrée : il est calculé une fois
+    par taille (avec le même padding nul que la convolution d'origine) puis mis en cache.
+    """
+
+    def __init__(self, conv: nn.Conv2d, mean, std):
+        super().__init__()
+        weight = conv.weight.detach()
+        mean = torch.as_tensor(mean, dtype=weight.dtype, device=weight.device).view(1, -1, 1, 1)
+        std = torch.as_tensor(std, dtype=weight.dtype, device=weight.device).view(1, -1, 1, 1)
+
+        self.weight = nn.Parameter((weight / std).sum(dim=1, keepdim=True))
+        self.register_buffer('offset_weight', (weight * (-mean / std)).sum(dim=1, keepdim=True))
+        self.bias = None if conv.bias is None else nn.Parameter(conv.bias.detach().clone())
+        self.stride = conv.stride
+        self.padding = conv.padding
+        self.dilation = conv.dilation
+        self._offset_maps = {}
+
+    def _apply(self, fn, *args, **kwargs):
+        # Les cartes en cache suivent l'ancien device/dtype : on les invalide
+        self._offset_maps = {}
+        return super()._apply(fn, *args, **kwargs)
+
+    def _offset_map(self, height: int, width: int):
+        key = (height, width, self.offset_weight.device, self.offset_weight.dtype)
+        offset = self._offset_maps.get(key)
+        if offset is None:
+            with torch.no_grad():
+                ones = self.offset_weight.new_ones(1, 1, height, width)
+                offset = F.conv2d(ones, self.offset_weight, None, self.stride, self.padding, self.dilation)
+            self._offset_maps[key] = offset
+        return offset
+
+    def forward(self, x):
+        out = F.conv2d(x, self.weight, self.bias, self.stride, self.padding, self.dilation)
+        return out + self._offset_map(x.shape[-2], x.shape[-1])
+
+
+def _first_conv(model: nn.Module):
+    """Retourne (module parent, nom) de la première convolution (conv1 de ResNet, features[0][0] de MobileNet)"""
+    for name, module in model.named_modules():
+        if isinstance(module, (nn.Conv2d, GrayscaleStem)):
+            parent_name, _, child_name = name.rpartition('.')
+            return model.get_submodule(parent_name), child_name
+    raise ValueError("Aucune convolution trouvée dans le modèle")
+
+
+def fold_grayscale_input(model: nn.Module, mean, std) -> nn.Module:
+    """Replie la normalisation et les 3 canaux d'entrée de la première convolution (modèle modifié en place)"""
+    parent, name = _first_conv(model)
+    conv = getattr(parent, name)
+    if isinstance(conv, GrayscaleStem):
+        return model
+    setattr(parent, name, GrayscaleStem(conv, mean, std))
+    return model
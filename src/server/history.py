@@ -0,0 +1,240 @@
+"""
+Historique durable des prédictions (SQLite en mode WAL, écritures groupées en arrière-plan)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    digest TEXT NOT NULL,
+    model_version TEXT,
+    prediction TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    prob_normal REAL NOT NULL,
+    prob_pneumonia REAL NOT NULL,
+    timings TEXT,
+    client TEXT,
+    lane TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_digest ON predictions (digest, created_at);
+CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions (created_at);
+"""
+
+_INSERT = """
+INSERT INTO predictions (created_at, digest, model_version, prediction, confidence,
+                         prob_normal, prob_pneumonia, timings, client, lane)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+
+class PredictionHistory:
+    """
+    record() calcule l'empreinte SHA-256 de l'image et ajoute la ligne à une file bornée
+    (sans E/S, sans conserver l'image ; file pleine = ligne abandonnée et comptée) ;
+    un thread regroupe les lignes en une transaction par lot (group commit).
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = 0.5, max_batch: int = 512,
+                 retention_days: float = None, max_rows: int = None, maintenance_interval: float = 3600,
+                 max_pending: int = 10000):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self.maintenance_interval = maintenance_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._writer = None
+        self._written = 0
+        self._dropped = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        # auto_vacuum doit être fixé avant la création des tables
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        connection.close()
+        self._writer = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._writer.start()
+        logger.info(f"Historique des prédictions: {self.db_path}")
+
+    def record(self, image_bytes: bytes, model_version: str, result: dict, timings: dict = None,
+               client: str = None, lane: str = None):
+        """Ajoute une prédiction réussie à la file d'écriture (sans E/S, jamais bloquant)"""
+        if self._writer is None:
+            return
+        try:
+            self._queue.put_nowait(self._row(time.time(), hashlib.sha256(image_bytes).hexdigest(),
+                                             model_version, result, timings, client, lane))
+        except queue.Full:
+            self._dropped += 1
+
+    def close(self):
+        """Vide la file puis arrête le thread d'écriture"""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
+    @staticmethod
+    def _row(created_at: float, digest: str, model_version: str, result: dict, timings: dict,
+             client: str, lane: str) -> tuple:
+        return (
+            created_at,
+            digest,
+            model_version,
+            result['prediction'],
+            result['confidence'],
+            result['probabilities']['NORMAL'],
+            result['probabilities']['PNEUMONIA'],
+            json.dumps(timings) if timings else None,
+            client,
+            lane
+        )
+
+    def _run(self):
+        connection = self._connect()
+        # Rétention appliquée dès le démarrage : un processus redémarré souvent l'applique aussi
+        self._maintain(connection)
+        last_maintenance = time.monotonic()
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.maintenance_interval)
+            except queue.Empty:
+                first = None
+
+            batch = []
+            if first is _STOP:
+                stopping = True
+            elif first is not None:
+                batch.append(first)
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+            if batch:
+                try:
+                    with connection:
+                        connection.executemany(_INSERT, batch)
+                    self._written += len(batch)
+                except Exception as e:
+                    self._dropped += len(batch)
+                    logger.error(f"Erreur écriture historique ({len(batch)} lignes perdues): {e}")
+
+            if time.monotonic() - last_maintenance >= self.maintenance_interval:
+                self._maintain(connection)
+                last_maintenance = time.monotonic()
+
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.close()
+
+    def _maintain(self, connection):
+        try:
+            deleted = self.apply_retention(connection)
+            if deleted:
+                self.compact(connection)
+        except Exception as e:
+            logger.error(f"Erreur maintenance historique: {e}")
+
+    def apply_retention(self, connection: sqlite3.Connection = None) -> int:
+        """Supprime les lignes plus anciennes que retention_days et au-delà de max_rows"""
+        own = connection is None
+        connection = connection or self._connect()
+        try:
+            deleted = 0
+            with connection:
+                if self.retention_days:
+                    cutoff = time.time() - self.retention_days * 86400
+                    deleted += connection.execute("DELETE FROM predictions WHERE created_at < ?", (cutoff,)).rowcount
+                if self.max_rows:
+                    deleted += connection.execute(
+                        "DELETE FROM predictions WHERE id <= "
+                        "(SELECT id FROM predictions ORDER BY id DESC LIMIT 1 OFFSET ?)", (self.max_rows,)
+                    ).rowcount
+            if deleted:
+                logger.info(f"Historique: {deleted} lignes supprimées (rétention)")
+            return deleted
+        finally:
+            if own:
+                connection.close()
+
+    def compact(self, connection: sqlite3.Connection = None):
+        """Libère les pages supprimées et tronque le journal WAL"""
+        own = connection is None
+        connection = connection or self._connect()
+        try:
+            connection.execute("PRAGMA incremental_vacuum")
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            if own:
+                connection.close()
+
+    def query(self, digest: str = None, since: float = None, until: float = None, limit: int = 100) -> list:
+        """Recherche par empreinte et/ou intervalle de temps (secondes epoch), plus récentes d'abord"""
+        clauses, params = [], []
+        if digest:
+            clauses.append("digest = ?")
+            params.append(digest)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f"SELECT * FROM predictions {where} ORDER BY created_at DESC LIMIT ?", params
+            ).fetchall()
+        finally:
+            connection.close()
+
+        results = []
+        for row in rows:
+            entry = dict(row)
+            entry['timings'] = json.loads(entry['timings']) if entry['timings'] else None
+            results.append(entry)
+        return results
+
+    def stats(self) -> dict:
+        return {
+            'db_path': self.db_path,
+            'pending': self._queue.qsize(),
+            'written': self._written,
+            'dropped': self._dropped
+        }
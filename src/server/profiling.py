@@ -0,0 +1,107 @@
+"""
+Profilage à la demande du serveur : torch.profiler sur le thread d'inférence
+et échantillonnage des piles Python de tous les threads
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import Counter
+
+import torch
+
+
+class StackSampler(threading.Thread):
+    """Échantillonne périodiquement les piles Python ; sortie au format « collapsed » (flamegraph.pl, speedscope)"""
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def folded(self) -> str:
+        return '\n'.join(f"{stack} {count}" for stack, count in self.samples.most_common()) + '\n'
+
+
+class Profiler:
+    """
+    Une session à la fois. Le profileur torch est démarré puis arrêté sur le thread
+    d'inférence lui-même (executor à un seul thread), qui exécute toutes les passes avant.
+    Hors session, aucun code de profilage n'est exécuté.
+    """
+
+    def __init__(self, executor, interval: float = 0.005):
+        self.executor = executor
+        self.interval = interval
+        self._lock = asyncio.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    async def capture(self, seconds: float) -> bytes:
+        """Profile le trafic réel pendant `seconds` et retourne une archive zip"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            torch_profiler = torch.profiler.profile(
+                activities=[torch.profiler.ProfilerActivity.CPU],
+                record_shapes=True,
+                profile_memory=True
+            )
+            sampler = StackSampler(self.interval)
+
+            await loop.run_in_executor(self.executor, torch_profiler.__enter__)
+            sampler.start()
+            started = time.time()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                sampler.stop()
+                await loop.run_in_executor(self.executor, torch_profiler.__exit__, None, None, None)
+
+            return await loop.run_in_executor(None, self._package, torch_profiler, sampler, started, seconds)
+
+    def _package(self, torch_profiler, sampler, started: float, seconds: float) -> bytes:
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path = os.path.join(tmp, 'trace.json')
+            torch_profiler.export_chrome_trace(trace_path)
+            averages = torch_profiler.key_averages()
+            operators = (
+                f"Profil de {seconds:.0f}s démarré le {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))}\n\n"
+                "=== Temps CPU par opérateur ===\n"
+                f"{averages.table(sort_by='self_cpu_time_total', row_limit=40)}\n\n"
+                "=== Mémoire CPU par opérateur ===\n"
+                f"{averages.table(sort_by='self_cpu_memory_usage', row_limit=40)}\n"
+            )
+
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.write(trace_path, 'trace.json')
+                archive.writestr('stacks.folded', sampler.folded())
+                archive.writestr('operators.txt', operators)
+            return buffer.getvalue()
@@ -0,0 +1,164 @@
+"""
+Ordonnancement de l'inférence : voies de priorité pondérées et échéances par requête
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(Exception):
+    """L'échéance de la requête est dépassée avant son passage dans le modèle"""
+
+
+class QueueFull(Exception):
+    """La file de la voie a atteint sa capacité maximale"""
+
+
+def parse_mapping(value: str, cast=str) -> dict:
+    """Analyse une variable d'environnement de la forme 'a:1,b:2'"""
+    mapping = {}
+    for item in (value or '').split(','):
+        if ':' in item:
+            key, _, val = item.strip().partition(':')
+            mapping[key.strip()] = cast(val.strip())
+    return mapping
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class InferenceScheduler:
+    """
+    File d'attente par voie, servie par un unique worker selon un ordonnancement équitable
+    pondéré (stride scheduling) : une voie de poids w obtient w images traitées pour
+    chaque image d'une voie de poids 1 lorsque les deux sont chargées.
+    Les requêtes dont l'échéance est dépassée sont abandonnées avant la passe avant.
+    """
+
+    def __init__(self, weights: dict, default_lane: str, max_queue: int = 256, history: int = 1000):
+        if default_lane not in weights:
+            raise ValueError(f"Voie par défaut inconnue: {default_lane}")
+        invalid = {lane: weight for lane, weight in weights.items() if not weight > 0}
+        if invalid:
+            raise ValueError(f"Les poids des voies doivent être strictement positifs: {invalid}")
+        self.weights = weights
+        self.default_lane = default_lane
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self._queues = {lane: deque() for lane in weights}
+        self._pass = {lane: 0.0 for lane in weights}
+        self._virtual_time = 0.0
+        self._waits = {lane: deque(maxlen=history) for lane in weights}
+        self._counters = {lane: {'processed': 0, 'expired': 0, 'rejected': 0} for lane in weights}
+        self._wakeup = None
+        self._worker = None
+
+    def resolve_lane(self, requested: str = None) -> str:
+        return requested if requested in self.weights else self.default_lane
+
+    def start(self):
+        if self._worker is None:
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, fn, *args, lane: str = None, deadline: float = None, cost: int = 1):
+        """
+        Exécute fn(*args) sur le thread d'inférence quand la voie est servie.
+        deadline: instant time.monotonic() au-delà duquel la requête est abandonnée.
+        cost: nombre d'images traitées, décompté du crédit de la voie.
+        """
+        self.start()
+        lane = self.resolve_lane(lane)
+        queue = self._queues[lane]
+        if len(queue) >= self.max_queue:
+            self._counters[lane]['rejected'] += 1
+            raise QueueFull(f"File '{lane}' pleine ({self.max_queue} requêtes)")
+
+        # Une voie qui redevient active repart du temps virtuel courant (pas de crédit accumulé)
+        if not queue:
+            self._pass[lane] = max(self._pass[lane], self._virtual_time)
+
+        future = asyncio.get_running_loop().create_future()
+        queue.append((future, fn, args, cost, time.monotonic(), deadline))
+        self._wakeup.set()
+        return await future
+
+    async def submit_batch(self, fn, items: list, batch_size: int, lane: str = None, deadline: float = None) -> list:
+        """
+        Soumet fn(lot) pour chaque lot de batch_size éléments, l'un après l'autre : les autres
+        voies sont servies entre deux lots et l'échéance est vérifiée avant chacun.
+        Retourne la concaténation des résultats.
+        """
+        results = []
+        for start in range(0, len(items), batch_size):
+            chunk = items[start:start + batch_size]
+            results.extend(await self.submit(fn, chunk, lane=lane, deadline=deadline, cost=len(chunk)))
+        return results
+
+    def _next_lane(self):
+        active = [lane for lane, queue in self._queues.items() if queue]
+        if not active:
+            return None
+        return min(active, key=self._pass.__getitem__)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lane = self._next_lane()
+            if lane is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            future, fn, args, cost, enqueued_at, deadline = self._queues[lane].popleft()
+            if future.done():
+                # Client déconnecté pendant l'attente
+                continue
+            # Une erreur inattendue n'échoue que la requête courante : le worker doit survivre
+            try:
+                await self._dispatch(loop, lane, future, fn, args, cost, enqueued_at, deadline)
+            except Exception as e:
+                logger.error(f"Échec de la requête (voie {lane}): {e}")
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _dispatch(self, loop, lane: str, future, fn, args, cost: int, enqueued_at: float, deadline: float):
+        now = time.monotonic()
+        if deadline is not None and now > deadline:
+            self._counters[lane]['expired'] += 1
+            future.set_exception(DeadlineExceeded(
+                f"Échéance dépassée de {(now - deadline) * 1000:.0f} ms après {(now - enqueued_at) * 1000:.0f} ms d'attente"))
+            return
+
+        self._virtual_time = self._pass[lane]
+        self._pass[lane] += cost / self.weights[lane]
+        self._waits[lane].append((now - enqueued_at) * 1000)
+        result = await loop.run_in_executor(self.executor, fn, *args)
+        self._counters[lane]['processed'] += 1
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        """Taille des files, compteurs et temps d'attente (ms) par voie"""
+        lanes = {}
+        for lane, weight in self.weights.items():
+            waits = list(self._waits[lane])
+            lanes[lane] = dict(
+                self._counters[lane],
+                weight=weight,
+                queued=len(self._queues[lane]),
+                queue_wait_ms={
+                    'avg': sum(waits) / len(waits),
+                    'p50': _percentile(waits, 0.50),
+                    'p95': _percentile(waits, 0.95),
+                    'max': max(waits)
+                } if waits else None
+            )
+        return {'default_lane': self.default_lane, 'lanes': lanes}
@@ -1,15 +1,14 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from PIL import Image
-import torch
-from torchvision import transforms, models
-import torch.nn as nn
-import io
+import asyncio
+import hmac
 import uvicorn
 import os
 import sys
 from datetime import datetime
 import logging
+import time
+from typing import List, Optional
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +17,12 @@ logger = logging.getLogger(__name__)
 # Ajouter le chemin source pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+from src.server import dicom
+from src.server.classifier import PneumoniaClassifier
+from src.server.history import PredictionHistory
+from src.server.profiling import Profiler
+from src.server.scheduling import DeadlineExceeded, InferenceScheduler, QueueFull, parse_mapping
+
 app = FastAPI(
     title="MediBot MCP Server",
     description="Model Context Protocol Server for Pneumonia Classification",
@@ -33,107 +38,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class PneumoniaClassifier:
-    def __init__(self, model_path: str):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model_path = model_path
-        self.model = self._load_model()
-        self.transform = self._get_transforms()
-        self.class_names = ['NORMAL', 'PNEUMONIA']
-        logger.info("Classificateur de pneumonie initialisé")
-
-    def _create_model_architecture(self):
-        """Crée l'architecture du modèle identique à l'entraînement"""
-        model = models.resnet50(pretrained=False)
-        num_ftrs = model.fc.in_features
-        model.fc = nn.Sequential(
-            nn.Dropout(0.3),
-            nn.Linear(num_ftrs, 512),
-            nn.BatchNorm1d(512),
-            nn.ReLU(inplace=True),
-            nn.Dropout(0.2),
-            nn.Linear(512, 256),
-            nn.BatchNorm1d(256),
-            nn.ReLU(inplace=True),
-            nn.Dropout(0.1),
-            nn.Linear(256, 2)
-        )
-        return model
-
-    def _load_model(self):
-        """Charge le modèle entraîné"""
-        try:
-            if not os.path.exists(self.model_path):
-                logger.error(f"Fichier modèle non trouvé: {self.model_path}")
-                return None
-            
-            logger.info(f"Chargement du modèle depuis: {self.model_path}")
-            model = self._create_model_architecture()
-            
-            # Charger les poids
-            if self.model_path.endswith('_inference.pth'):
-                state_dict = torch.load(self.model_path, map_location=self.device)
-                model.load_state_dict(state_dict)
-            else:
-                checkpoint = torch.load(self.model_path, map_location=self.device)
-                if 'model_state_dict' in checkpoint:
-                    model.load_state_dict(checkpoint['model_state_dict'])
-                else:
-                    model.load_state_dict(checkpoint)
-            
-            model.eval()
-            model.to(self.device)
-            logger.info("Modèle chargé avec succès")
-            return model
-            
-        except Exception as e:
-            logger.error(f"Erreur chargement modèle: {e}")
-            return None
-
-    def _get_transforms(self):
-        """Transformations identiques à l'entraînement"""
-        return transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
-        ])
-
-    def predict(self, image_bytes: bytes) -> dict:
-        """Prédit sur une image"""
-        try:
-            if self.model is None:
-                return {"error": "Modèle non chargé", "status": "error"}
-
-            # Conversion bytes → image
-            image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-            
-            # Transformation
-            image_tensor = self.transform(image).unsqueeze(0).to(self.device)
-            
-            # Prédiction
-            with torch.no_grad():
-                outputs = self.model(image_tensor)
-                probabilities = torch.nn.functional.softmax(outputs, dim=1)
-                confidence, prediction = torch.max(probabilities, 1)
-            
-            return {
-                'prediction': self.class_names[prediction.item()],
-                'confidence': confidence.item(),
-                'probabilities': {
-                    'NORMAL': probabilities[0][0].item(),
-                    'PNEUMONIA': probabilities[0][1].item()
-                },
-                'status': 'success'
-            }
-            
-        except Exception as e:
-            logger.error(f"Erreur prédiction: {e}")
-            return {'error': str(e), 'status': 'error'}
-
 # Initialisation du classifieur
 model_path = os.getenv('MODEL_PATH', 'models/pneumonia_classifier_inference_20251115_163236.pth')
 classifier = PneumoniaClassifier(model_path)
 
+# Voies de priorité : les uploads interactifs (interface, chat) ne sont pas bloqués par les traitements en masse
+scheduler = InferenceScheduler(
+    weights=parse_mapping(os.getenv('LANE_WEIGHTS', 'interactive:8,bulk:1'), float),
+    default_lane=os.getenv('DEFAULT_LANE', 'bulk'),
+    max_queue=int(os.getenv('MAX_QUEUE_PER_LANE', 256))
+)
+lane_api_keys = parse_mapping(os.getenv('LANE_API_KEYS', ''))
+
+# Historique des prédictions (désactivé si HISTORY_DB est vide)
+history = PredictionHistory(
+    os.getenv('HISTORY_DB', 'data/predictions.db'),
+    retention_days=float(os.getenv('HISTORY_RETENTION_DAYS', 90)) or None,
+    max_rows=int(os.getenv('HISTORY_MAX_ROWS', 0)) or None
+) if os.getenv('HISTORY_DB', 'data/predictions.db') else None
+
+@app.on_event("startup")
+async def start_history():
+    if history is not None:
+        history.start()
+
+@app.on_event("shutdown")
+async def stop_history():
+    if history is not None:
+        history.close()
+
+# Profilage à la demande (désactivé si DEBUG_TOKEN est vide)
+profiler = Profiler(scheduler.executor)
+
+def _resolve_lane(x_priority: Optional[str], x_api_key: Optional[str]) -> str:
+    """La voie associée à une clé API prime sur l'en-tête X-Priority"""
+    if x_api_key and x_api_key in lane_api_keys:
+        return scheduler.resolve_lane(lane_api_keys[x_api_key])
+    return scheduler.resolve_lane(x_priority)
+
+def _deadline(x_deadline_ms: Optional[float]) -> Optional[float]:
+    """Échéance absolue (time.monotonic) relative à l'arrivée de la requête"""
+    return time.monotonic() + x_deadline_ms / 1000 if x_deadline_ms is not None else None
+
+async def _run_inference(fn, payload, lane: str, deadline: Optional[float], batch_size: int = None):
+    """Passe par l'ordonnanceur ; avec batch_size, chaque lot est ordonnancé séparément"""
+    try:
+        if batch_size is not None:
+            return await scheduler.submit_batch(fn, payload, batch_size, lane=lane, deadline=deadline)
+        return await scheduler.submit(fn, payload, lane=lane, deadline=deadline)
+    except DeadlineExceeded as e:
+        logger.warning(f"Requête abandonnée (voie {lane}): {e}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 @app.get("/")
 async def root():
     return {
@@ -151,16 +109,43 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
+TRUTHY = {'1', 'true', 'yes'}
+
+def _check_upload(filename: str, content_type: str, data: bytes):
+    """Accepte les images (PIL) et les fichiers DICOM"""
+    content_type = content_type or ''
+    if dicom.is_dicom(data):
+        if not dicom.dicom_available():
+            raise HTTPException(status_code=415, detail="Support DICOM indisponible (pydicom non installé)")
+    elif not content_type.startswith('image/'):
+        raise HTTPException(status_code=400, detail=f"Le fichier {filename} doit être une image ou un fichier DICOM")
+
+async def _predict_with_timings(image_bytes: bytes, lane: str, deadline: Optional[float]) -> dict:
+    """Prédiction instrumentée : attente en file, décodage, prétraitement, inférence"""
+    timings = {}
+    submitted = time.perf_counter()
+
+    def predict_timed(payload):
+        timings['queue_wait_ms'] = (time.perf_counter() - submitted) * 1000
+        return classifier.predict(payload, timings)
+
+    result = await _run_inference(predict_timed, image_bytes, lane, deadline)
+    timings['total_ms'] = (time.perf_counter() - submitted) * 1000
+    return dict(result, timings=timings)
+
 @app.post("/predict")
-async def predict_pneumonia(file: UploadFile = File(...)):
+async def predict_pneumonia(request: Request,
+                            file: UploadFile = File(...),
+                            x_priority: Optional[str] = Header(None),
+                            x_api_key: Optional[str] = Header(None),
+                            x_deadline_ms: Optional[float] = Header(None),
+                            x_debug_timings: Optional[str] = Header(None)):
     """
     Endpoint pour la classification de pneumonie
+    (en-têtes optionnels : X-Priority interactive|bulk, X-API-Key, X-Deadline-Ms,
+    X-Debug-Timings: 1 pour joindre les durées par étape à la réponse)
     """
     try:
-        # Vérification du type de fichier
-        if not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="Le fichier doit être une image")
-        
         # Vérification de la taille (max 10MB)
         file.file.seek(0, 2)  # aller à la fin
         file_size = file.file.tell()
@@ -172,14 +157,26 @@ async def predict_pneumonia(file: UploadFile = File(...)):
         
         # Lecture de l'image
         image_bytes = await file.read()
+        # Vérification du type de fichier (images, ou DICOM détecté par sa signature)
+        _check_upload(file.filename, file.content_type, image_bytes)
         
         # Prédiction
-        result = classifier.predict(image_bytes)
+        lane = _resolve_lane(x_priority, x_api_key)
+        deadline = _deadline(x_deadline_ms)
+        start = time.perf_counter()
+        if (x_debug_timings or '').strip().lower() in TRUTHY:
+            result = await _predict_with_timings(image_bytes, lane, deadline)
+        else:
+            result = await _run_inference(classifier.predict, image_bytes, lane, deadline)
         
         if result['status'] == 'error':
             raise HTTPException(status_code=500, detail=result['error'])
         
         logger.info(f"Prédiction effectuée: {result['prediction']} (confiance: {result['confidence']:.2f})")
+        if history is not None:
+            timings = result.get('timings') or {'total_ms': (time.perf_counter() - start) * 1000}
+            history.record(image_bytes, classifier.model_version, result, timings,
+                           request.client.host if request.client else None, lane)
         
         return result
         
@@ -189,18 +186,134 @@ async def predict_pneumonia(file: UploadFile = File(...)):
         logger.error(f"Erreur traitement: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erreur lors du traitement: {str(e)}")
 
+@app.post("/predict/batch")
+async def predict_pneumonia_batch(request: Request,
+                                  files: List[UploadFile] = File(...),
+                                  x_priority: Optional[str] = Header(None),
+                                  x_api_key: Optional[str] = Header(None),
+                                  x_deadline_ms: Optional[float] = Header(None)):
+    """
+    Endpoint de classification par lot (traitements en masse) : les images sont décodées
+    hors du thread d'inférence puis chaque lot passe séparément par l'ordonnanceur
+    """
+    deadline = _deadline(x_deadline_ms)
+    max_files = int(os.getenv('MAX_BATCH_FILES', 64))
+    if len(files) > max_files:
+        raise HTTPException(status_code=400, detail=f"Trop de fichiers. Maximum: {max_files}")
+
+    max_size = int(os.getenv('MAX_FILE_SIZE_MB', 10)) * 1024 * 1024
+    images_bytes = []
+    for file in files:
+        image_bytes = await file.read()
+        _check_upload(file.filename, file.content_type, image_bytes)
+        if len(image_bytes) > max_size:
+            raise HTTPException(status_code=400, detail=f"Fichier {file.filename} trop volumineux. Maximum: {max_size//(1024*1024)}MB")
+        images_bytes.append(image_bytes)
+
+    lane = _resolve_lane(x_priority, x_api_key)
+    start = time.perf_counter()
+    results = await asyncio.get_running_loop().run_in_executor(None, classifier.decode_images, images_bytes)
+    indices = [i for i, item in enumerate(results) if not isinstance(item, dict)]
+    predictions = await _run_inference(classifier.predict_images, [results[i] for i in indices],
+                                       lane, deadline, batch_size=classifier.batch_size)
+    for i, result in zip(indices, predictions):
+        results[i] = result
+    logger.info(f"Prédiction par lot effectuée: {len(results)} images")
+    if history is not None:
+        timings = {'batch_total_ms': (time.perf_counter() - start) * 1000, 'batch_count': len(results)}
+        client = request.client.host if request.client else None
+        for image_bytes, result in zip(images_bytes, results):
+            if result['status'] == 'success':
+                history.record(image_bytes, classifier.model_version, result, timings, client, lane)
+    return {"results": results, "count": len(results)}
+
+@app.post("/dicom/tags")
+async def dicom_tags(file: UploadFile = File(...)):
+    """Lit les en-têtes techniques d'un fichier DICOM sans décoder les données pixel"""
+    if not dicom.dicom_available():
+        raise HTTPException(status_code=415, detail="Support DICOM indisponible (pydicom non installé)")
+    data = await file.read()
+    if not dicom.is_dicom(data):
+        raise HTTPException(status_code=400, detail="Le fichier n'est pas un fichier DICOM")
+    try:
+        return {"tags": dicom.read_tags(data), "status": "success"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"En-têtes DICOM illisibles: {e}")
+
 @app.get("/model/info")
 async def model_info():
     """Retourne les informations du modèle"""
     return {
-        "model_name": "ResNet50 Pneumonia Classifier",
+        "model_name": f"{classifier.architecture} Pneumonia Classifier",
+        "architecture": classifier.architecture,
         "input_size": "224x224",
         "classes": classifier.class_names,
-        "description": "Modèle de classification de pneumonie basé sur ResNet50",
+        "description": f"Modèle de classification de pneumonie basé sur {classifier.architecture}",
         "model_loaded": classifier.model is not None,
-        "device": str(classifier.device)
+        "device": str(classifier.device),
+        "input_channels": classifier.input_shape[0],
+        "model_version": classifier.model_version,
+        "runtime_profile": {k: v for k, v in classifier.runtime_profile.items() if k != 'measurements'},
+        "cascade": {
+            "enabled": classifier.cascade_threshold is not None,
+            "threshold": classifier.cascade_threshold,
+            "low_res_size": f"{classifier.low_res}x{classifier.low_res}",
+            "decided_by_stage": classifier.cascade_stats
+        }
     }
 
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    """Files d'attente, requêtes abandonnées et temps d'attente par voie"""
+    return scheduler.stats()
+
+def _check_token(env_var: str, provided: Optional[str], disabled_detail: str):
+    """Endpoint réservé : désactivé si la variable d'environnement est vide, sinon jeton requis"""
+    token = os.getenv(env_var, '')
+    if not token:
+        raise HTTPException(status_code=404, detail=disabled_detail)
+    if not provided or not hmac.compare_digest(provided, token):
+        raise HTTPException(status_code=403, detail="Jeton invalide")
+
+@app.get("/history")
+def prediction_history(digest: Optional[str] = None,
+                       since: Optional[datetime] = None,
+                       until: Optional[datetime] = None,
+                       limit: int = Query(100, ge=1, le=10000),
+                       x_history_token: Optional[str] = Header(None)):
+    """
+    Historique des prédictions par empreinte SHA-256 de l'image et/ou intervalle de temps (ISO 8601).
+    Réservé aux détenteurs de HISTORY_TOKEN (en-tête X-History-Token) ; exécuté hors de la boucle
+    d'événements (lecture SQLite bloquante).
+    """
+    _check_token('HISTORY_TOKEN', x_history_token, "Consultation de l'historique désactivée")
+    if history is None:
+        raise HTTPException(status_code=404, detail="Historique désactivé")
+    return {
+        "results": history.query(digest=digest,
+                                 since=since.timestamp() if since else None,
+                                 until=until.timestamp() if until else None,
+                                 limit=limit),
+        "store": history.stats()
+    }
+
+@app.get("/debug/profile")
+async def debug_profile(seconds: float = Query(10, ge=1, le=120),
+                        x_debug_token: Optional[str] = Header(None)):
+    """
+    Profile le trafic réel pendant N secondes (torch.profiler + échantillonnage des piles Python).
+    Retourne un zip : trace.json (chrome://tracing, Perfetto), stacks.folded (flamegraph), operators.txt
+    """
+    _check_token('DEBUG_TOKEN', x_debug_token, "Profilage désactivé")
+    if profiler.busy:
+        raise HTTPException(status_code=409, detail="Un profilage est déjà en cours")
+
+    logger.info(f"Profilage démarré pour {seconds:.0f}s")
+    archive = await profiler.capture(seconds)
+    filename = f"medibot_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return Response(content=archive, media_type="application/zip",
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
 if __name__ == "__main__":
     port = int(os.getenv("MCP_SERVER_PORT", 8000))
     logger.info(f"🚀 Démarrage du serveur MCP sur le port {port}")
@@ -0,0 +1,26 @@
+"""
+Module d'entraînement et de distillation du classificateur de pneumonie
+"""
+
+import importlib
+
+_EXPORTS = {
+    "ARCHITECTURES": "architectures",
+    "create_model_architecture": "architectures",
+    "load_model": "architectures",
+    "EarlyStopping": "trainer",
+    "advanced_train_model": "trainer",
+    "create_optimized_model": "trainer",
+    "evaluate_model": "trainer",
+}
+
+
+def __getattr__(name):
+    # Import différé : le serveur n'importe que le registre d'architectures,
+    # sans charger la boucle d'entraînement (trainer, optimiseurs, numpy).
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = list(_EXPORTS)
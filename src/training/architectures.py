@@ -0,0 +1,77 @@
+"""
+Architectures de classification partagées entre l'entraînement et le serveur
+"""
+
+import torch
+import torch.nn as nn
+from torchvision import models
+
+DEFAULT_ARCHITECTURE = 'resnet50'
+
+
+def _classifier_head(num_ftrs: int, num_classes: int = 2) -> nn.Sequential:
+    """Tête de classification identique à celle du notebook d'entraînement"""
+    return nn.Sequential(
+        nn.Dropout(0.3),
+        nn.Linear(num_ftrs, 512),
+        nn.BatchNorm1d(512),
+        nn.ReLU(inplace=True),
+        nn.Dropout(0.2),
+        nn.Linear(512, 256),
+        nn.BatchNorm1d(256),
+        nn.ReLU(inplace=True),
+        nn.Dropout(0.1),
+        nn.Linear(256, num_classes)
+    )
+
+
+def _resnet(factory, pretrained: bool):
+    model = factory(weights='DEFAULT' if pretrained else None)
+    model.fc = _classifier_head(model.fc.in_features)
+    return model
+
+
+def _mobilenet_v3(factory, pretrained: bool):
+    model = factory(weights='DEFAULT' if pretrained else None)
+    model.classifier[-1] = nn.Linear(model.classifier[-1].in_features, 2)
+    return model
+
+
+ARCHITECTURES = {
+    'resnet50': lambda pretrained: _resnet(models.resnet50, pretrained),
+    'resnet18': lambda pretrained: _resnet(models.resnet18, pretrained),
+    'mobilenet_v3_small': lambda pretrained: _mobilenet_v3(models.mobilenet_v3_small, pretrained),
+    'mobilenet_v3_large': lambda pretrained: _mobilenet_v3(models.mobilenet_v3_large, pretrained),
+}
+
+
+def create_model_architecture(name: str = DEFAULT_ARCHITECTURE, pretrained: bool = False) -> nn.Module:
+    """Crée une architecture à 2 classes à partir de son nom"""
+    if name not in ARCHITECTURES:
+        raise ValueError(f"Architecture inconnue: {name} (disponibles: {', '.join(ARCHITECTURES)})")
+    return ARCHITECTURES[name](pretrained)
+
+
+def load_model(model_path: str, device, architecture: str = None) -> tuple:
+    """
+    Charge un checkpoint (state_dict seul ou dictionnaire complet).
+    L'architecture enregistrée dans le checkpoint est prioritaire sur celle demandée.
+    Retourne (modèle en mode eval, nom de l'architecture).
+    """
+    checkpoint = torch.load(model_path, map_location=device)
+    if isinstance(checkpoint, dict) and 'model_state_dict' in checkpoint:
+        architecture = checkpoint.get('architecture') or architecture
+        state_dict = checkpoint['model_state_dict']
+    else:
+        state_dict = checkpoint
+    architecture = architecture or DEFAULT_ARCHITECTURE
+
+    model = create_model_architecture(architecture)
+    model.load_state_dict(state_dict)
+    model.eval()
+    model.to(device)
+    return model, architecture
+
+
+def count_parameters(model: nn.Module) -> int:
+    return sum(p.numel() for p in model.parameters())
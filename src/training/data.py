@@ -0,0 +1,78 @@
+"""
+Jeux de données et transformations d'entraînement (arborescence ImageFolder chest_xray)
+"""
+
+import multiprocessing
+import os
+
+import torch
+from torch.utils.data import DataLoader, WeightedRandomSampler
+from torchvision import transforms
+from torchvision.datasets import ImageFolder
+
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+SUBSETS = ['train', 'val', 'test']
+
+# Transformation des données avec augmentation avancée
+advanced_transforms = {
+    'train': transforms.Compose([
+        transforms.Resize((256, 256)),
+        transforms.RandomResizedCrop(224, scale=(0.8, 1.0)),
+        transforms.RandomHorizontalFlip(p=0.5),
+        transforms.RandomRotation(degrees=15),
+        transforms.ColorJitter(brightness=0.2, contrast=0.2, saturation=0.2, hue=0.1),
+        transforms.RandomAffine(degrees=0, translate=(0.1, 0.1), scale=(0.9, 1.1)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)
+    ]),
+    'val': transforms.Compose([
+        transforms.Resize((224, 224)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)
+    ]),
+    'test': transforms.Compose([
+        transforms.Resize((224, 224)),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)
+    ])
+}
+
+
+def default_num_workers() -> int:
+    return min(8, multiprocessing.cpu_count())
+
+
+def class_weights_for(targets, num_classes: int = 2):
+    """Poids inverses des effectifs de classes"""
+    class_counts = [targets.count(i) for i in range(num_classes)]
+    return 1. / torch.tensor(class_counts, dtype=torch.float)
+
+
+def build_dataloaders(datasets: dict, batch_size: int = 32, num_workers: int = None) -> dict:
+    """DataLoaders avec échantillonnage pondéré pour gérer le déséquilibre des classes"""
+    num_workers = default_num_workers() if num_workers is None else num_workers
+    targets = list(datasets['train'].targets)
+    class_weights = class_weights_for(targets)
+    weighted_sampler = WeightedRandomSampler(
+        weights=class_weights[targets],
+        num_samples=len(datasets['train']),
+        replacement=True
+    )
+    pin_memory = torch.cuda.is_available()
+    return {
+        'train': DataLoader(datasets['train'], batch_size=batch_size,
+                            sampler=weighted_sampler, num_workers=num_workers, pin_memory=pin_memory),
+        'val': DataLoader(datasets['val'], batch_size=batch_size,
+                          shuffle=False, num_workers=num_workers, pin_memory=pin_memory),
+        'test': DataLoader(datasets['test'], batch_size=batch_size,
+                           shuffle=False, num_workers=num_workers, pin_memory=pin_memory)
+    }
+
+
+def load_image_folders(data_dir: str) -> dict:
+    """Charge les sous-dossiers train/val/test avec leurs transformations"""
+    return {
+        x: ImageFolder(os.path.join(data_dir, x), advanced_transforms[x])
+        for x in SUBSETS
+    }
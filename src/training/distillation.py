@@ -0,0 +1,39 @@
+"""
+Distillation d'un modèle enseignant (ResNet50) vers un petit modèle élève
+"""
+
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+class DistillationLoss(nn.Module):
+    """
+    alpha * T² * KL(softmax(enseignant / T) || softmax(élève / T)) + (1 - alpha) * CE(élève, étiquettes)
+    Sans logits enseignant (phase de validation), seule la cross-entropy est calculée.
+    """
+
+    def __init__(self, class_weights=None, temperature: float = 4.0, alpha: float = 0.7):
+        super().__init__()
+        self.temperature = temperature
+        self.alpha = alpha
+        self.cross_entropy = nn.CrossEntropyLoss(weight=class_weights)
+
+    def forward(self, outputs, labels, teacher_outputs=None):
+        hard_loss = self.cross_entropy(outputs, labels)
+        if teacher_outputs is None:
+            return hard_loss
+        t = self.temperature
+        soft_loss = F.kl_div(
+            F.log_softmax(outputs / t, dim=1),
+            F.softmax(teacher_outputs.float() / t, dim=1),
+            reduction='batchmean'
+        ) * (t * t)
+        return self.alpha * soft_loss + (1 - self.alpha) * hard_loss
+
+
+def freeze(model: nn.Module) -> nn.Module:
+    """Fige l'enseignant : mode eval, pas de gradients"""
+    model.eval()
+    for param in model.parameters():
+        param.requires_grad = False
+    return model
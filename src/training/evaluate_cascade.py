@@ -0,0 +1,128 @@
+"""
+Compromis précision / débit du mode cascade selon le seuil de confiance
+
+Chaque image d'un dossier étiqueté (<dossier>/NORMAL, <dossier>/PNEUMONIA) passe une fois
+dans chaque étage ; les seuils sont ensuite simulés à partir de ces mesures.
+
+Exemple:
+    python src/training/evaluate_cascade.py --data-dir chest_xray/test --thresholds 0.8 0.9 0.95 0.99
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Ajouter le chemin source pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+VALID_EXTS = ('.jpeg', '.jpg', '.png', '.dcm')
+DEFAULT_MODEL_PATH = 'models/pneumonia_classifier_inference_20251115_163236.pth'
+
+
+def _timed_forward(classifier, image, stage: str):
+    timings = {}
+    result = classifier.predict_stage([image], stage, timings)[0]
+    return result, timings[f'{stage}_inference_ms']
+
+
+def measure(classifier, data_dir: str, limit: int = None) -> list:
+    """Prédiction et latence de chaque étage pour chaque image"""
+    measurements = []
+    for label, class_name in enumerate(classifier.class_names):
+        class_dir = os.path.join(data_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        fnames = [fname for fname in sorted(os.listdir(class_dir)) if fname.lower().endswith(VALID_EXTS)]
+        for fname in fnames[:limit]:
+            with open(os.path.join(class_dir, fname), 'rb') as f:
+                image = classifier.decode_images([f.read()])[0]
+            if isinstance(image, dict):
+                continue
+            low, low_ms = _timed_forward(classifier, image, 'low_res')
+            full, full_ms = _timed_forward(classifier, image, 'full_res')
+            measurements.append({
+                'label': label,
+                'low_res_prediction': classifier.class_names.index(low['prediction']),
+                'low_res_confidence': low['confidence'],
+                'low_res_ms': low_ms,
+                'full_res_prediction': classifier.class_names.index(full['prediction']),
+                'full_res_ms': full_ms
+            })
+    return measurements
+
+
+def simulate(measurements: list, threshold: float) -> dict:
+    """Précision, taux d'escalade et débit du modèle en cascade pour un seuil donné"""
+    correct, escalated, total_ms = 0, 0, 0.0
+    for m in measurements:
+        total_ms += m['low_res_ms']
+        if m['low_res_confidence'] >= threshold:
+            correct += m['low_res_prediction'] == m['label']
+        else:
+            escalated += 1
+            total_ms += m['full_res_ms']
+            correct += m['full_res_prediction'] == m['label']
+    n = len(measurements)
+    return {
+        'threshold': threshold,
+        'accuracy': correct / n,
+        'escalation_rate': escalated / n,
+        'avg_latency_ms': total_ms / n,
+        'images_per_second': 1000 * n / total_ms
+    }
+
+
+def baseline(measurements: list) -> dict:
+    """Pleine résolution uniquement (mode actuel sans cascade)"""
+    n = len(measurements)
+    total_ms = sum(m['full_res_ms'] for m in measurements)
+    return {
+        'threshold': None,
+        'accuracy': sum(m['full_res_prediction'] == m['label'] for m in measurements) / n,
+        'escalation_rate': 1.0,
+        'avg_latency_ms': total_ms / n,
+        'images_per_second': 1000 * n / total_ms
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Évaluation du mode cascade MediBot")
+    parser.add_argument('--data-dir', required=True, help="Dossier contenant NORMAL/ et PNEUMONIA/")
+    parser.add_argument('--model-path', default=os.getenv('MODEL_PATH', DEFAULT_MODEL_PATH))
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.7, 0.8, 0.9, 0.95, 0.99])
+    parser.add_argument('--limit', type=int, default=None, help="Nombre maximal d'images par classe")
+    parser.add_argument('--output', help="Fichier JSON de résultats")
+    args = parser.parse_args(argv)
+
+    # Import différé : simulate() et baseline() restent utilisables sans torch
+    import torch
+    from src.server.classifier import PneumoniaClassifier
+
+    classifier = PneumoniaClassifier(args.model_path)
+    if classifier.model is None:
+        raise SystemExit(f"Modèle non chargé: {args.model_path}")
+
+    start = time.perf_counter()
+    with torch.no_grad():
+        measurements = measure(classifier, args.data_dir, args.limit)
+    if not measurements:
+        raise SystemExit(f"Aucune image trouvée dans {args.data_dir}")
+    print(f"{len(measurements)} images mesurées en {time.perf_counter() - start:.1f}s "
+          f"(basse résolution {classifier.low_res}x{classifier.low_res})")
+
+    rows = [baseline(measurements)] + [simulate(measurements, t) for t in sorted(args.thresholds)]
+    print(f"\n{'Seuil':>10}{'Précision':>12}{'Escalade':>12}{'Latence moy.':>15}{'Images/s':>12}")
+    for row in rows:
+        threshold = 'pleine' if row['threshold'] is None else f"{row['threshold']:.2f}"
+        print(f"{threshold:>10}{row['accuracy']:>12.2%}{row['escalation_rate']:>12.1%}"
+              f"{row['avg_latency_ms']:>12.1f} ms{row['images_per_second']:>12.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'low_res': classifier.low_res, 'images': len(measurements), 'results': rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Décode une seule fois l'arborescence chest_xray/{train,val,test} en shards memmap
+
+Exemple:
+    python src/training/prepare_dataset.py --data-dir chest_xray --output-dir data/chest_xray_shards
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Ajouter le chemin source pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.training.shards import DEFAULT_SIZES, prepare_shards, summarize_shards
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def print_summary(summary: dict):
+    """Même affichage que analyze_images du notebook, sans rouvrir les fichiers"""
+    for (subset, category), stats in summary.items():
+        print(f"{subset.upper()} / {category}: {stats['count']} images")
+        print(f"   Smallest: {stats['smallest'][0]}x{stats['smallest'][1]}")
+        print(f"   Biggest:  {stats['biggest'][0]}x{stats['biggest'][1]}")
+        print(f"   Average:  {stats['average'][0]:.1f}x{stats['average'][1]:.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Préparation du cache de dataset MediBot")
+    parser.add_argument('--data-dir', help="Dossier chest_xray contenant train/val/test")
+    parser.add_argument('--output-dir', required=True)
+    parser.add_argument('--train-size', type=int, default=DEFAULT_SIZES['train'])
+    parser.add_argument('--eval-size', type=int, default=DEFAULT_SIZES['val'])
+    parser.add_argument('--shard-size', type=int, default=2048, help="Images par shard")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--summary-only', action='store_true', help="Affiche les statistiques d'un cache existant")
+    args = parser.parse_args(argv)
+
+    if not args.summary_only:
+        if not args.data_dir:
+            parser.error("--data-dir est requis pour préparer le cache")
+        start = time.perf_counter()
+        sizes = {'train': args.train_size, 'val': args.eval_size, 'test': args.eval_size}
+        counts = prepare_shards(args.data_dir, args.output_dir, sizes, args.shard_size, args.workers)
+        logger.info(f"Cache préparé en {time.perf_counter() - start:.1f}s: {counts}")
+
+    print_summary(summarize_shards(args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
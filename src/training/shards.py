@@ -0,0 +1,183 @@
+"""
+Cache de dataset pré-décodé : images uint8 de taille fixe en shards NumPy memmap
+
+Arborescence produite (une par sous-ensemble train/val/test):
+    <output_dir>/<subset>/index.json     classes, taille, shards et métadonnées par image
+    <output_dir>/<subset>/labels.npy     étiquettes (int64)
+    <output_dir>/<subset>/shard_0000.u8  images (N, H, W) uint8 en niveaux de gris
+"""
+
+import bisect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import Dataset
+from torchvision import transforms
+
+from src.training.data import IMAGENET_MEAN, IMAGENET_STD, SUBSETS
+
+VALID_EXTS = ('.jpeg', '.jpg', '.png')
+
+# Taille stockée : train garde la marge du Resize((256, 256)) pour le recadrage aléatoire
+DEFAULT_SIZES = {'train': 256, 'val': 224, 'test': 224}
+
+# Augmentations équivalentes au notebook, appliquées sur tenseurs à 1 canal
+# (saturation et teinte n'ont pas d'effet sur une radiographie en niveaux de gris)
+shard_transforms = {
+    'train': transforms.Compose([
+        transforms.RandomResizedCrop(224, scale=(0.8, 1.0), antialias=True),
+        transforms.RandomHorizontalFlip(p=0.5),
+        transforms.RandomRotation(degrees=15),
+        transforms.ColorJitter(brightness=0.2, contrast=0.2),
+        transforms.RandomAffine(degrees=0, translate=(0.1, 0.1), scale=(0.9, 1.1)),
+    ]),
+    'val': None,
+    'test': None
+}
+
+
+def _list_samples(subset_path: str):
+    """Équivalent d'ImageFolder : classes triées, fichiers image de chaque classe"""
+    classes = sorted(d for d in os.listdir(subset_path) if os.path.isdir(os.path.join(subset_path, d)))
+    samples = []
+    for label, category in enumerate(classes):
+        category_path = os.path.join(subset_path, category)
+        for fname in sorted(os.listdir(category_path)):
+            if fname.lower().endswith(VALID_EXTS):
+                samples.append((os.path.join(category_path, fname), label))
+    return classes, samples
+
+
+def _decode(args):
+    """Décode une image en niveaux de gris à la taille cible (décodage JPEG réduit si possible)"""
+    path, size = args
+    with Image.open(path) as img:
+        width, height = img.size
+        img.draft('L', (size, size))
+        pixels = np.asarray(img.convert('L').resize((size, size), Image.BILINEAR), dtype=np.uint8)
+    return pixels, width, height
+
+
+def prepare_subset(subset_path: str, output_path: str, size: int, shard_size: int = 2048, workers: int = None) -> dict:
+    """Décode un sous-ensemble une seule fois et écrit ses shards"""
+    classes, samples = _list_samples(subset_path)
+    os.makedirs(output_path, exist_ok=True)
+
+    shards, metadata = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for shard_id, start in enumerate(range(0, len(samples), shard_size)):
+            chunk = samples[start:start + shard_size]
+            filename = f'shard_{shard_id:04d}.u8'
+            images = np.memmap(os.path.join(output_path, filename), dtype=np.uint8, mode='w+',
+                               shape=(len(chunk), size, size))
+            decoded = pool.map(_decode, [(path, size) for path, _ in chunk], chunksize=16)
+            for i, ((pixels, width, height), (path, label)) in enumerate(zip(decoded, chunk)):
+                images[i] = pixels
+                metadata.append({'path': os.path.relpath(path, subset_path), 'label': label,
+                                 'width': width, 'height': height})
+            images.flush()
+            del images
+            shards.append({'file': filename, 'count': len(chunk)})
+
+    np.save(os.path.join(output_path, 'labels.npy'), np.array([m['label'] for m in metadata], dtype=np.int64))
+    index = {'classes': classes, 'image_size': size, 'shards': shards, 'samples': metadata}
+    with open(os.path.join(output_path, 'index.json'), 'w') as f:
+        json.dump(index, f)
+    return index
+
+
+def prepare_shards(data_dir: str, output_dir: str, sizes: dict = None, shard_size: int = 2048, workers: int = None) -> dict:
+    """Prépare train/val/test ; retourne le nombre d'images par sous-ensemble"""
+    sizes = dict(DEFAULT_SIZES, **(sizes or {}))
+    counts = {}
+    for subset in SUBSETS:
+        subset_path = os.path.join(data_dir, subset)
+        if not os.path.exists(subset_path):
+            continue
+        index = prepare_subset(subset_path, os.path.join(output_dir, subset), sizes[subset], shard_size, workers)
+        counts[subset] = len(index['samples'])
+    return counts
+
+
+def summarize_shards(output_dir: str) -> dict:
+    """Statistiques de tailles d'origine par sous-ensemble et classe, lues depuis l'index"""
+    summary = {}
+    for subset in SUBSETS:
+        index_path = os.path.join(output_dir, subset, 'index.json')
+        if not os.path.exists(index_path):
+            continue
+        with open(index_path) as f:
+            index = json.load(f)
+        for label, category in enumerate(index['classes']):
+            sizes = [(m['width'], m['height']) for m in index['samples'] if m['label'] == label]
+            if not sizes:
+                continue
+            widths, heights = zip(*sizes)
+            summary[(subset, category)] = {
+                'count': len(sizes),
+                'smallest': (min(widths), min(heights)),
+                'biggest': (max(widths), max(heights)),
+                'average': (float(np.mean(widths)), float(np.mean(heights)))
+            }
+    return summary
+
+
+class ShardDataset(Dataset):
+    """
+    Dataset sur shards memmap : chaque image est une vue sans copie du fichier,
+    augmentée sur tenseur (1 canal) puis étendue aux 3 canaux et normalisée.
+    """
+
+    def __init__(self, root: str, subset: str, transform=None, output_size: int = 224):
+        self.root = os.path.join(root, subset)
+        with open(os.path.join(self.root, 'index.json')) as f:
+            index = json.load(f)
+        self.classes = index['classes']
+        self.image_size = index['image_size']
+        self.samples = index['samples']
+        self.targets = np.load(os.path.join(self.root, 'labels.npy')).tolist()
+        self._shard_files = [s['file'] for s in index['shards']]
+        self._offsets = np.cumsum([0] + [s['count'] for s in index['shards']]).tolist()
+        self.transform = transform if transform is not None else shard_transforms.get(subset)
+        self.output_size = output_size
+        self._shards = None
+
+    def _open(self):
+        # Ouverture différée : chaque worker du DataLoader mappe ses propres fichiers.
+        # Mode copy-on-write : tableaux inscriptibles pour torch, sans copie tant qu'on n'écrit pas.
+        self._shards = [
+            np.memmap(os.path.join(self.root, name), dtype=np.uint8, mode='c',
+                      shape=(self._offsets[i + 1] - self._offsets[i], self.image_size, self.image_size))
+            for i, name in enumerate(self._shard_files)
+        ]
+
+    def __len__(self):
+        return self._offsets[-1]
+
+    def __getitem__(self, idx):
+        if self._shards is None:
+            self._open()
+        shard = bisect.bisect_right(self._offsets, idx) - 1
+        pixels = torch.from_numpy(self._shards[shard][idx - self._offsets[shard]])
+
+        image = pixels.unsqueeze(0).float().div_(255)
+        if self.transform is not None:
+            image = self.transform(image)
+        if image.shape[-1] != self.output_size:
+            image = transforms.functional.resize(image, [self.output_size, self.output_size], antialias=True)
+        image = transforms.functional.normalize(image.expand(3, -1, -1), IMAGENET_MEAN, IMAGENET_STD)
+        return image, self.targets[idx]
+
+    def __getstate__(self):
+        # Les memmaps ne sont pas transmis aux workers : ils seront rouverts
+        state = self.__dict__.copy()
+        state['_shards'] = None
+        return state
+
+
+def load_shard_datasets(root: str) -> dict:
+    return {x: ShardDataset(root, x) for x in SUBSETS}
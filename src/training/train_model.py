@@ -0,0 +1,138 @@
+"""
+Entraînement du classificateur de pneumonie, avec mode distillation vers un modèle élève
+
+Exemples:
+    python src/training/train_model.py --data-dir chest_xray --arch resnet50
+    python src/training/train_model.py --shards data/chest_xray_shards --arch resnet50
+    python src/training/train_model.py --data-dir chest_xray --mode distill --arch resnet18 \\
+        --teacher models/pneumonia_classifier_inference_20251115_163236.pth
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+
+import torch
+
+# Ajouter le chemin source pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.training.architectures import ARCHITECTURES, count_parameters, load_model
+from src.training.data import build_dataloaders, class_weights_for, load_image_folders
+from src.training.distillation import DistillationLoss, freeze
+from src.training.shards import load_shard_datasets
+from src.training.trainer import advanced_train_model, benchmark_latency, create_optimized_model, evaluate_model
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Entraînement MediBot (classification de pneumonie)")
+    parser.add_argument('--data-dir', help="Dossier chest_xray contenant train/val/test")
+    parser.add_argument('--shards', help="Cache pré-décodé (voir prepare_dataset.py), à la place de --data-dir")
+    parser.add_argument('--mode', choices=['train', 'distill'], default='train')
+    parser.add_argument('--arch', choices=sorted(ARCHITECTURES), default='resnet50',
+                        help="Architecture entraînée (l'élève en mode distill)")
+    parser.add_argument('--teacher', help="Checkpoint de l'enseignant (mode distill)")
+    parser.add_argument('--teacher-arch', choices=sorted(ARCHITECTURES), default='resnet50')
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--lr', type=float, default=0.001)
+    parser.add_argument('--patience', type=int, default=10)
+    parser.add_argument('--temperature', type=float, default=4.0)
+    parser.add_argument('--alpha', type=float, default=0.7, help="Poids de la loss de distillation")
+    parser.add_argument('--num-workers', type=int, default=None)
+    parser.add_argument('--output-dir', default='models')
+    return parser.parse_args(argv)
+
+
+def describe(model, name, dataloader, device) -> dict:
+    """Précision sur le jeu de test et latence CPU batch 1"""
+    metrics = evaluate_model(model, dataloader, device)
+    latency = benchmark_latency(model.to('cpu'), torch.device('cpu'))
+    model.to(device)
+    return {
+        'architecture': name,
+        'parameters': count_parameters(model),
+        'accuracy': metrics['accuracy'],
+        'cpu_latency_ms': latency['latency_ms'],
+        'cpu_images_per_second': latency['images_per_second']
+    }
+
+
+def print_report(rows):
+    print(f"\n{'Modèle':<12}{'Architecture':<22}{'Paramètres':>14}{'Précision':>12}{'Latence CPU':>14}")
+    for role, row in rows:
+        print(f"{role:<12}{row['architecture']:<22}{row['parameters']:>14,}{row['accuracy']:>12.2%}"
+              f"{row['cpu_latency_ms']:>11.1f} ms")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.mode == 'distill' and not args.teacher:
+        raise SystemExit("--teacher est requis en mode distill")
+    if not args.data_dir and not args.shards:
+        raise SystemExit("--data-dir ou --shards est requis")
+
+    device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+    datasets = load_shard_datasets(args.shards) if args.shards else load_image_folders(args.data_dir)
+    dataloaders = build_dataloaders(datasets, batch_size=args.batch_size, num_workers=args.num_workers)
+    class_weights = class_weights_for(list(datasets['train'].targets))
+    class_names = datasets['train'].classes
+    dataset_sizes = {x: len(d) for x, d in datasets.items()}
+    logger.info(f"Classes: {class_names} | Nombre d'images: {dataset_sizes}")
+
+    teacher, teacher_arch = None, None
+    criterion = None
+    if args.mode == 'distill':
+        teacher, teacher_arch = load_model(args.teacher, device, args.teacher_arch)
+        freeze(teacher)
+        criterion = DistillationLoss(class_weights, temperature=args.temperature, alpha=args.alpha)
+        logger.info(f"Distillation {teacher_arch} → {args.arch}")
+
+    model, optimizer, scheduler, criterion, device = create_optimized_model(
+        class_weights, steps_per_epoch=len(dataloaders['train']), architecture=args.arch,
+        learning_rate=args.lr, epochs=args.epochs, device=device, criterion=criterion
+    )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    best_path = os.path.join(args.output_dir, f'best_{args.arch}_{timestamp}.pth')
+    model, train_losses, val_losses, train_accs, val_accs = advanced_train_model(
+        model, criterion, optimizer, scheduler, dataloaders, device, num_epochs=args.epochs,
+        checkpoint_path=best_path, patience=args.patience, teacher=teacher
+    )
+
+    # Charger le meilleur modèle puis sauvegarder un checkpoint chargeable par le serveur
+    model.load_state_dict(torch.load(best_path, map_location=device))
+    os.remove(best_path)
+    output_path = os.path.join(args.output_dir, f'pneumonia_classifier_{args.arch}_{timestamp}.pth')
+    torch.save({
+        'model_state_dict': model.state_dict(),
+        'architecture': args.arch,
+        'class_names': class_names,
+        'train_losses': train_losses,
+        'val_losses': val_losses,
+        'train_accs': train_accs,
+        'val_accs': val_accs,
+        'distilled_from': args.teacher if args.mode == 'distill' else None
+    }, output_path)
+    logger.info(f"Modèle sauvegardé: {output_path}")
+
+    rows = [('élève' if teacher is not None else 'modèle', describe(model, args.arch, dataloaders['test'], device))]
+    if teacher is not None:
+        rows.insert(0, ('enseignant', describe(teacher, teacher_arch, dataloaders['test'], device)))
+    print_report(rows)
+
+    report_path = os.path.splitext(output_path)[0] + '_report.json'
+    with open(report_path, 'w') as f:
+        json.dump({role: row for role, row in rows}, f, indent=2)
+    logger.info(f"Rapport: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
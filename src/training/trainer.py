@@ -0,0 +1,211 @@
+"""
+Boucle d'entraînement, early stopping et évaluation (repris du notebook ChestX_RayClassification)
+"""
+
+import logging
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+from src.training.architectures import DEFAULT_ARCHITECTURE, create_model_architecture
+
+logger = logging.getLogger(__name__)
+
+
+class EarlyStopping:
+    def __init__(self, patience=7, verbose=False, delta=0, path='checkpoint.pth'):
+        self.patience = patience
+        self.verbose = verbose
+        self.counter = 0
+        self.best_score = None
+        self.early_stop = False
+        self.val_loss_min = np.inf
+        self.delta = delta
+        self.path = path
+
+    def __call__(self, val_loss, model):
+        score = -val_loss
+
+        if self.best_score is None:
+            self.best_score = score
+            self.save_checkpoint(val_loss, model)
+        elif score < self.best_score + self.delta:
+            self.counter += 1
+            logger.info(f'EarlyStopping counter: {self.counter} out of {self.patience}')
+            if self.counter >= self.patience:
+                self.early_stop = True
+        else:
+            self.best_score = score
+            self.save_checkpoint(val_loss, model)
+            self.counter = 0
+
+    def save_checkpoint(self, val_loss, model):
+        '''Sauvegarde le modèle quand la loss de validation diminue.'''
+        if self.verbose:
+            logger.info(f'Validation loss decreased ({self.val_loss_min:.6f} --> {val_loss:.6f}). Saving model...')
+        torch.save(model.state_dict(), self.path)
+        self.val_loss_min = val_loss
+
+
+def create_optimized_model(class_weights, steps_per_epoch, architecture=DEFAULT_ARCHITECTURE,
+                           learning_rate=0.001, fine_tune_layers=10, epochs=20, device=None,
+                           criterion=None):
+    """Crée le modèle pré-entraîné, l'optimiseur, le scheduler et la loss"""
+    device = device or torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+
+    # Architecture pré-entraînée avec classificateur personnalisé
+    model = create_model_architecture(architecture, pretrained=True)
+
+    # Fine-tuning progressif
+    layers_to_unfreeze = list(model.children())[-fine_tune_layers:]
+    for layer in layers_to_unfreeze:
+        for param in layer.parameters():
+            param.requires_grad = True
+
+    model = model.to(device)
+
+    # Optimiseur avec weight decay
+    optimizer = optim.AdamW(
+        filter(lambda p: p.requires_grad, model.parameters()),
+        lr=learning_rate,
+        weight_decay=1e-4
+    )
+
+    # Scheduler avec warmup
+    scheduler = optim.lr_scheduler.OneCycleLR(
+        optimizer,
+        max_lr=learning_rate,
+        epochs=epochs,
+        steps_per_epoch=steps_per_epoch
+    )
+
+    # Loss avec poids des classes
+    if criterion is None:
+        criterion = nn.CrossEntropyLoss(weight=class_weights.to(device))
+    else:
+        criterion = criterion.to(device)
+
+    return model, optimizer, scheduler, criterion, device
+
+
+def advanced_train_model(model, criterion, optimizer, scheduler, dataloaders, device, num_epochs=25,
+                         checkpoint_path='best_model_advanced.pth', patience=10, teacher=None):
+    """
+    Entraîne le modèle avec précision mixte (CUDA) et early stopping.
+    Avec un enseignant, la loss d'entraînement reçoit aussi ses logits
+    (criterion(outputs, labels, teacher_outputs)) ; la validation reste sur les étiquettes.
+    """
+    early_stopping = EarlyStopping(patience=patience, verbose=True, path=checkpoint_path)
+    use_amp = device.type == 'cuda'
+    scaler = torch.cuda.amp.GradScaler(enabled=use_amp)
+    train_losses, val_losses = [], []
+    train_accs, val_accs = [], []
+
+    for epoch in range(num_epochs):
+        logger.info(f'Epoch {epoch+1}/{num_epochs}')
+
+        for phase in ['train', 'val']:
+            if phase == 'train':
+                model.train()
+            else:
+                model.eval()
+
+            running_loss = 0.0
+            running_corrects = 0
+
+            for inputs, labels in dataloaders[phase]:
+                inputs = inputs.to(device, non_blocking=True)
+                labels = labels.to(device, non_blocking=True)
+
+                optimizer.zero_grad()
+
+                with torch.set_grad_enabled(phase == 'train'):
+                    # Mixed precision pour l'entraînement
+                    if phase == 'train':
+                        with torch.autocast(device_type=device.type, enabled=use_amp):
+                            outputs = model(inputs)
+                            if teacher is not None:
+                                with torch.no_grad():
+                                    teacher_outputs = teacher(inputs)
+                                loss = criterion(outputs, labels, teacher_outputs)
+                            else:
+                                loss = criterion(outputs, labels)
+
+                        scaler.scale(loss).backward()
+                        scaler.step(optimizer)
+                        scaler.update()
+                        scheduler.step()
+                    else:
+                        outputs = model(inputs)
+                        loss = criterion(outputs, labels)
+
+                    _, preds = torch.max(outputs, 1)
+
+                running_loss += loss.item() * inputs.size(0)
+                running_corrects += torch.sum(preds == labels.data)
+
+            epoch_loss = running_loss / len(dataloaders[phase].dataset)
+            epoch_acc = running_corrects.double() / len(dataloaders[phase].dataset)
+
+            if phase == 'train':
+                train_losses.append(epoch_loss)
+                train_accs.append(epoch_acc.item())
+                logger.info(f'Learning Rate: {optimizer.param_groups[0]["lr"]:.6f}')
+            else:
+                val_losses.append(epoch_loss)
+                val_accs.append(epoch_acc.item())
+
+                # Early stopping
+                early_stopping(epoch_loss, model)
+                if early_stopping.early_stop:
+                    logger.info("Early stopping triggered!")
+                    return model, train_losses, val_losses, train_accs, val_accs
+
+            logger.info(f'{phase.capitalize()} Loss: {epoch_loss:.4f} Acc: {epoch_acc:.4f}')
+
+    return model, train_losses, val_losses, train_accs, val_accs
+
+
+def evaluate_model(model, dataloader, device) -> dict:
+    """Précision et prédictions sur un jeu d'évaluation"""
+    model.eval()
+    all_preds = []
+    all_labels = []
+
+    with torch.no_grad():
+        for inputs, labels in dataloader:
+            outputs = model(inputs.to(device))
+            _, preds = torch.max(outputs, 1)
+            all_preds.extend(preds.cpu().tolist())
+            all_labels.extend(labels.tolist())
+
+    correct = sum(p == l for p, l in zip(all_preds, all_labels))
+    return {
+        'accuracy': correct / max(1, len(all_labels)),
+        'predictions': all_preds,
+        'labels': all_labels
+    }
+
+
+def benchmark_latency(model, device, input_shape=(3, 224, 224), batch_size=1, warmup=5, iterations=30) -> dict:
+    """Latence moyenne d'une passe avant sur entrées synthétiques"""
+    model.eval()
+    inputs = torch.randn(batch_size, *input_shape, device=device)
+    with torch.no_grad():
+        for _ in range(warmup):
+            model(inputs)
+        if device.type == 'cuda':
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            model(inputs)
+        if device.type == 'cuda':
+            torch.cuda.synchronize()
+    avg_time_per_batch = (time.perf_counter() - start) / iterations
+    return {
+        'latency_ms': avg_time_per_batch * 1000,
+        'images_per_second': batch_size / avg_time_per_batch
+    }
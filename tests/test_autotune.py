@@ -0,0 +1,68 @@
+"""
+Auto-réglage : profil mesuré puis enregistré au premier démarrage, réutilisé ensuite sans mesure
+"""
+
+import json
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.server.autotune import AutoTuner, apply_profile, host_signature
+
+INPUT_SHAPE = (1, 16, 16)
+
+
+def _petit_modele():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(
+        torch.nn.Conv2d(1, 4, 3, padding=1),
+        torch.nn.ReLU(),
+        torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(4, 2)
+    ).eval()
+
+
+def _tuner(path):
+    return AutoTuner(str(path), warmup=1, iterations=1, batch_sizes=(1, 2))
+
+
+def test_profil_mesure_puis_reutilise(tmp_path, monkeypatch):
+    path = tmp_path / 'profiles.json'
+    model = _petit_modele()
+    device = torch.device('cpu')
+
+    first = _tuner(path).resolve(model, device, 'v1', input_shape=INPUT_SHAPE)
+    assert first['source'] == 'benchmark'
+    assert first['batch_size'] in (1, 2)
+    assert first['memory_format'] in ('contiguous', 'channels_last')
+
+    profiles = json.loads(path.read_text())
+    assert list(profiles) == [f"{host_signature()}|v1|1x16x16"]
+
+    tuner = _tuner(path)
+
+    def benchmark(*args, **kwargs):
+        raise AssertionError("le profil enregistré aurait dû être réutilisé")
+
+    monkeypatch.setattr(tuner, 'benchmark', benchmark)
+    second = tuner.resolve(model, device, 'v1', input_shape=INPUT_SHAPE)
+    assert second['source'] == 'cache'
+    for key in ('num_threads', 'interop_threads', 'batch_size', 'memory_format'):
+        assert second[key] == first[key]
+
+
+def test_nouvelle_version_de_modele_remesuree(tmp_path):
+    path = tmp_path / 'profiles.json'
+    model = _petit_modele()
+    _tuner(path).resolve(model, torch.device('cpu'), 'v1', input_shape=INPUT_SHAPE)
+    profile = _tuner(path).resolve(model, torch.device('cpu'), 'v2', input_shape=INPUT_SHAPE)
+    assert profile['source'] == 'benchmark'
+    assert len(json.loads(path.read_text())) == 2
+
+
+def test_threads_inter_operateurs_effectifs():
+    profile = {'num_threads': torch.get_num_threads(), 'interop_threads': 1, 'memory_format': 'contiguous'}
+    applied = apply_profile(_petit_modele(), profile)
+    assert applied['interop_threads'] == torch.get_num_interop_threads()
@@ -0,0 +1,89 @@
+"""
+Mode cascade : escalade en pleine résolution sous le seuil de confiance,
+et simulation des seuils par l'outil d'évaluation
+"""
+
+import pytest
+
+from src.training.evaluate_cascade import baseline, simulate
+
+
+def _mesure(label, low_prediction, low_confidence, full_prediction):
+    return {
+        'label': label,
+        'low_res_prediction': low_prediction,
+        'low_res_confidence': low_confidence,
+        'low_res_ms': 1.0,
+        'full_res_prediction': full_prediction,
+        'full_res_ms': 4.0
+    }
+
+
+MESURES = [
+    _mesure(0, 0, 0.99, 0),  # sûr et correct en basse résolution
+    _mesure(1, 0, 0.60, 1),  # erreur basse résolution peu confiante, corrigée en pleine résolution
+    _mesure(1, 1, 0.92, 1),
+    _mesure(0, 1, 0.85, 0),  # erreur basse résolution, corrigée en pleine résolution
+]
+
+
+@pytest.mark.parametrize('threshold, accuracy, escalation_rate, avg_latency_ms', [
+    (0.5, 0.50, 0.00, 1.0),
+    (0.9, 1.00, 0.50, 3.0),
+    (0.92, 1.00, 0.50, 3.0),  # confiance égale au seuil : décidé en basse résolution
+    (0.95, 1.00, 0.75, 4.0),
+    (1.0, 1.00, 1.00, 5.0),
+])
+def test_simulation_des_seuils(threshold, accuracy, escalation_rate, avg_latency_ms):
+    row = simulate(MESURES, threshold)
+    assert row['threshold'] == threshold
+    assert row['accuracy'] == pytest.approx(accuracy)
+    assert row['escalation_rate'] == pytest.approx(escalation_rate)
+    assert row['avg_latency_ms'] == pytest.approx(avg_latency_ms)
+    assert row['images_per_second'] == pytest.approx(1000 / avg_latency_ms)
+
+
+def test_reference_pleine_resolution():
+    row = baseline(MESURES)
+    assert row['threshold'] is None
+    assert row['accuracy'] == 1.0
+    assert row['escalation_rate'] == 1.0
+    assert row['avg_latency_ms'] == pytest.approx(4.0)
+    assert row['images_per_second'] == pytest.approx(250.0)
+
+
+def test_escalade_sous_le_seuil():
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("torchvision")
+    Image = pytest.importorskip("PIL.Image")
+    from src.server.classifier import PneumoniaClassifier
+
+    class Modele(torch.nn.Module):
+        # Basse résolution : confiance croissante avec la luminosité ; pleine résolution : toujours confiant
+        def forward(self, x):
+            zeros = torch.zeros(x.shape[0])
+            if x.shape[-1] < 224:
+                return torch.stack([zeros, (x.mean(dim=(1, 2, 3)) - 0.5) * 20], dim=1)
+            return torch.stack([zeros, zeros + 5.0], dim=1)
+
+    classifier = PneumoniaClassifier.__new__(PneumoniaClassifier)
+    classifier.grayscale = True
+    classifier.device = torch.device('cpu')
+    classifier.memory_format = torch.contiguous_format
+    classifier.class_names = ['NORMAL', 'PNEUMONIA']
+    classifier.model = Modele().eval()
+    classifier.transform = classifier._get_transforms()
+    classifier.low_res = 112
+    classifier.low_res_transform = classifier._get_transforms(classifier.low_res)
+    classifier.cascade_threshold = 0.9
+    classifier.cascade_stats = {'low_res': 0, 'full_res': 0}
+
+    images = [Image.new('L', (300, 260), 255), Image.new('L', (300, 260), 128)]
+    results = classifier.predict_images(images)
+
+    assert [r['stage'] for r in results] == ['low_res', 'full_res']
+    assert results[0]['confidence'] >= 0.9
+    assert 'low_res_confidence' not in results[0]
+    assert results[1]['low_res_confidence'] < 0.9
+    assert results[1]['confidence'] > 0.99
+    assert classifier.cascade_stats == {'low_res': 1, 'full_res': 1}
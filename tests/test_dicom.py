@@ -0,0 +1,103 @@
+"""
+Lecture DICOM : détection, réduction entière par blocs, fenêtrage, inversion MONOCHROME1,
+en-têtes lus sans les données pixel
+"""
+
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL.Image")
+
+from src.server import dicom
+
+
+def test_is_dicom():
+    assert dicom.is_dicom(b'\0' * 128 + b'DICM' + b'\0' * 16)
+    assert not dicom.is_dicom(b'\0' * 128 + b'DIC')
+    assert not dicom.is_dicom(b'\x89PNG\r\n\x1a\n' + b'\0' * 200)
+
+
+def test_moyenne_par_blocs_entiere():
+    frame = np.arange(16, dtype=np.uint16).reshape(4, 4)
+    reduced = dicom._block_mean(frame, 2)
+    assert reduced.tolist() == [[2, 4], [10, 12]]
+    assert reduced.dtype == np.int64
+    assert dicom._block_mean(frame, 1) is frame
+
+    # Bords tronqués, pas de débordement sur des valeurs 16 bits
+    saturated = np.full((5, 5), 65535, dtype=np.uint16)
+    assert dicom._block_mean(saturated, 2).tolist() == [[65535, 65535], [65535, 65535]]
+
+
+def _dicom_bytes(pixels, photometric='MONOCHROME1', window=(1500, 3000)) -> bytes:
+    pydicom = pytest.importorskip("pydicom")
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = '1.2.840.10008.5.1.4.1.1.1'  # Computed Radiography
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.SOPClassUID = meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.Modality = 'CR'
+    ds.PatientName = 'Anonyme'
+    ds.Rows, ds.Columns = pixels.shape
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = photometric
+    ds.BitsAllocated = 16
+    ds.BitsStored = 12
+    ds.HighBit = 11
+    ds.PixelRepresentation = 0
+    ds.WindowCenter, ds.WindowWidth = window
+    ds.PixelData = pixels.astype(np.uint16).tobytes()
+
+    buffer = io.BytesIO()
+    try:
+        pydicom.dcmwrite(buffer, ds, enforce_file_format=True)
+    except TypeError:  # pydicom < 3
+        ds.is_little_endian, ds.is_implicit_VR = True, False
+        pydicom.dcmwrite(buffer, ds, write_like_original=False)
+    return buffer.getvalue()
+
+
+def _radiographie():
+    # Moitié gauche peu atténuée, moitié droite très atténuée ; frontière alignée sur les blocs
+    pixels = np.full((600, 500), 100, dtype=np.uint16)
+    pixels[:, 250:] = 3000
+    return pixels
+
+
+@pytest.mark.parametrize('photometric, left, right', [('MONOCHROME1', 255, 0), ('MONOCHROME2', 0, 255)])
+def test_decodage_reduit(photometric, left, right):
+    data = _dicom_bytes(_radiographie(), photometric)
+    assert dicom.is_dicom(data)
+
+    image = dicom.decode(data, size=224)
+    assert image.mode == 'L'
+    # Facteur entier 2 : 600x500 → 300x250, plus petit côté >= 224
+    assert image.size == (250, 300)
+    assert min(image.size) >= 224
+
+    pixels = np.asarray(image)
+    assert pixels[:, :125].min() == pixels[:, :125].max() == left
+    assert pixels[:, 125:].min() == pixels[:, 125:].max() == right
+
+
+def test_en_tetes_sans_donnees_pixel():
+    data = _dicom_bytes(_radiographie())
+    # Pixel Data tronqué : la lecture des en-têtes ne doit pas l'atteindre
+    truncated = data[:len(data) - 500 * 600]
+
+    tags = dicom.read_tags(truncated)
+    assert tags['Modality'] == 'CR'
+    assert tags['Rows'] == 600
+    assert tags['Columns'] == 500
+    assert tags['PhotometricInterpretation'] == 'MONOCHROME1'
+    assert tags['TransferSyntaxUID'] == '1.2.840.10008.1.2.1'
+    assert 'PatientName' not in tags
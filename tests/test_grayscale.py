@@ -0,0 +1,72 @@
+"""
+Parité entre le modèle RGB normalisé et sa variante à conv1 repliée en niveaux de gris
+"""
+
+import copy
+
+import pytest
+
+torch = pytest.importorskip("torch")
+models = pytest.importorskip("torchvision.models")
+transforms = pytest.importorskip("torchvision.transforms")
+Image = pytest.importorskip("PIL.Image")
+
+from src.server.grayscale import fold_grayscale_input
+
+MEAN = [0.485, 0.456, 0.406]
+STD = [0.229, 0.224, 0.225]
+
+
+def _modeles(dtype):
+    torch.manual_seed(0)
+    reference = models.resnet50(weights=None)
+    reference.fc = torch.nn.Linear(reference.fc.in_features, 2)
+    reference.eval().to(dtype)
+    folded = fold_grayscale_input(copy.deepcopy(reference), MEAN, STD).eval()
+    return reference, folded
+
+
+def _radiographie(size=(300, 260)):
+    generator = torch.Generator().manual_seed(1)
+    pixels = torch.randint(0, 256, (size[1], size[0]), dtype=torch.uint8, generator=generator)
+    return Image.fromarray(pixels.numpy())
+
+
+@pytest.mark.parametrize("size", [224, 112])
+def test_sorties_identiques_float64(size):
+    reference, folded = _modeles(torch.float64)
+    image = _radiographie()
+    resize = transforms.Compose([transforms.Resize((size, size)), transforms.ToTensor()])
+
+    # Prétraitement : l'image grise redimensionnée vaut chaque canal de la version RGB
+    gray = resize(image).unsqueeze(0)
+    rgb = resize(image.convert('RGB')).unsqueeze(0)
+    assert gray.shape == (1, 1, size, size)
+    torch.testing.assert_close(rgb, gray.expand(-1, 3, -1, -1), rtol=0, atol=0)
+
+    mean = torch.tensor(MEAN, dtype=torch.float64).view(1, 3, 1, 1)
+    std = torch.tensor(STD, dtype=torch.float64).view(1, 3, 1, 1)
+    normalized = (rgb.double() - mean) / std
+    with torch.no_grad():
+        torch.testing.assert_close(folded(gray.double()), reference(normalized), rtol=1e-7, atol=1e-7)
+
+
+def test_probabilites_identiques_float32():
+    reference, folded = _modeles(torch.float32)
+    torch.manual_seed(2)
+    gray = torch.rand(4, 1, 224, 224)
+    mean = torch.tensor(MEAN).view(1, 3, 1, 1)
+    std = torch.tensor(STD).view(1, 3, 1, 1)
+    rgb = (gray.expand(-1, 3, -1, -1) - mean) / std
+
+    with torch.no_grad():
+        expected = torch.softmax(reference(rgb), dim=1)
+        actual = torch.softmax(folded(gray), dim=1)
+    torch.testing.assert_close(actual, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_repliement_idempotent():
+    _, folded = _modeles(torch.float32)
+    stem = folded.conv1
+    assert fold_grayscale_input(folded, MEAN, STD).conv1 is stem
+    assert stem.weight.shape == (64, 1, 7, 7)
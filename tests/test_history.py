@@ -0,0 +1,106 @@
+"""
+Historique des prédictions : écritures groupées, recherche, rétention au démarrage, file bornée
+"""
+
+import hashlib
+import sqlite3
+import time
+
+from src.server.history import _INSERT, PredictionHistory
+
+
+def _result(prediction='PNEUMONIA', confidence=0.9):
+    return {
+        'prediction': prediction,
+        'confidence': confidence,
+        'probabilities': {'NORMAL': 1 - confidence, 'PNEUMONIA': confidence},
+        'status': 'success'
+    }
+
+
+def _insert_old_rows(db_path, count, age_days):
+    created_at = time.time() - age_days * 86400
+    connection = sqlite3.connect(db_path)
+    with connection:
+        connection.executemany(_INSERT, [
+            (created_at, f'old{i}', 'v0', 'NORMAL', 0.8, 0.8, 0.2, None, None, 'bulk') for i in range(count)
+        ])
+    connection.close()
+
+
+def test_ecritures_groupees(tmp_path):
+    history = PredictionHistory(str(tmp_path / 'history.db'), flush_interval=0.05)
+    history.start()
+    for i in range(20):
+        history.record(f'image{i}'.encode(), 'v1', _result(), {'total_ms': float(i)}, '10.0.0.1', 'interactive')
+    history.close()
+
+    assert history.stats()['written'] == 20
+    assert history.stats()['dropped'] == 0
+    rows = history.query(limit=100)
+    assert len(rows) == 20
+    assert rows[0]['created_at'] >= rows[-1]['created_at']
+
+    digest = hashlib.sha256(b'image3').hexdigest()
+    match = history.query(digest=digest)
+    assert len(match) == 1
+    assert match[0]['timings'] == {'total_ms': 3.0}
+    assert match[0]['prediction'] == 'PNEUMONIA'
+    assert match[0]['lane'] == 'interactive'
+    assert history.query(since=time.time() + 60) == []
+
+
+def test_retention(tmp_path):
+    db_path = str(tmp_path / 'history.db')
+    history = PredictionHistory(db_path, flush_interval=0.05)
+    history.start()
+    for i in range(5):
+        history.record(f'image{i}'.encode(), 'v1', _result(), None)
+    history.close()
+    _insert_old_rows(db_path, 3, age_days=10)
+
+    history.retention_days = 7
+    assert history.apply_retention() == 3
+    assert len(history.query(limit=100)) == 5
+
+    history.retention_days = None
+    history.max_rows = 2
+    assert history.apply_retention() == 3
+    assert len(history.query(limit=100)) == 2
+    history.compact()
+
+
+def test_retention_appliquee_au_demarrage(tmp_path):
+    db_path = str(tmp_path / 'history.db')
+    setup = PredictionHistory(db_path)
+    setup.start()
+    setup.close()
+    _insert_old_rows(db_path, 4, age_days=30)
+
+    history = PredictionHistory(db_path, retention_days=7, maintenance_interval=3600)
+    history.start()
+    history.close()
+    assert history.query(limit=100) == []
+
+
+def test_file_pleine_sans_blocage(tmp_path):
+    db_path = str(tmp_path / 'history.db')
+    history = PredictionHistory(db_path, flush_interval=0.01, max_batch=1, max_pending=2)
+    history.start()
+
+    # Écrivain bloqué par un verrou exclusif : la file se remplit, les lignes suivantes sont abandonnées
+    lock = sqlite3.connect(db_path, isolation_level=None)
+    lock.execute("BEGIN EXCLUSIVE")
+    start = time.monotonic()
+    for i in range(10):
+        history.record(f'image{i}'.encode(), 'v1', _result(), None)
+    assert time.monotonic() - start < 1
+    assert history.stats()['dropped'] >= 7
+    assert history.stats()['pending'] <= 2
+
+    lock.execute("COMMIT")
+    lock.close()
+    history.close()
+    stats = history.stats()
+    assert stats['written'] + stats['dropped'] == 10
+    assert len(history.query(limit=100)) == stats['written']
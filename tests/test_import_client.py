@@ -0,0 +1,57 @@
+"""
+Budget d'import de la couche client : aucune dépendance lourde ne doit être chargée
+par `import src.chatbot` / `import src.client`
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["torch", "torchvision", "openai", "numpy", "pandas", "sklearn", "transformers", "requests"]
+IMPORT_TIME_BUDGET_S = 0.5
+RSS_BUDGET_MB = 30
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+try:
+    import resource
+    maxrss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:  # Windows
+    maxrss_kb = None
+print(json.dumps({{
+    "elapsed": elapsed,
+    "maxrss_kb": maxrss_kb,
+    "heavy": sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def _probe(imports: str) -> dict:
+    code = _PROBE.format(imports=imports, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def test_client_sans_dependances_lourdes():
+    result = _probe("import src.chatbot, src.client")
+    assert result["heavy"] == []
+
+
+def test_budget_temps_et_memoire():
+    baseline = _probe("pass")
+    result = _probe("import src.chatbot, src.client")
+    assert result["elapsed"] < IMPORT_TIME_BUDGET_S
+    if result["maxrss_kb"] is not None:
+        assert (result["maxrss_kb"] - baseline["maxrss_kb"]) / 1024 < RSS_BUDGET_MB
+
+
+def test_paquet_training_sans_chargement_anticipe():
+    # Le serveur importe src.training.architectures : le paquet ne doit pas charger la boucle d'entraînement
+    result = _probe("import src.training")
+    assert result["heavy"] == []
@@ -0,0 +1,185 @@
+"""
+Ordonnanceur d'inférence : ordre pondéré des voies, échéances, capacité des files,
+lots servis entre les requêtes interactives, statistiques, poids invalides et erreurs
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.server.scheduling import DeadlineExceeded, InferenceScheduler, QueueFull, _percentile
+
+WEIGHTS = {'interactive': 8.0, 'bulk': 1.0, 'gate': 1.0}
+
+
+class Gate:
+    """Bloque le thread d'inférence pour accumuler des requêtes en file avant de les servir"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, _):
+        self.started.set()
+        self.release.wait(5)
+        return 'gate'
+
+    async def wait_started(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.started.wait, 5)
+
+
+def _scheduler(**kwargs):
+    return InferenceScheduler(dict(WEIGHTS), default_lane='bulk', **kwargs)
+
+
+def test_ordre_pondere_des_voies():
+    order = []
+
+    async def scenario():
+        scheduler = _scheduler()
+        gate = Gate()
+        blocked = asyncio.ensure_future(scheduler.submit(gate, None, lane='gate'))
+        await gate.wait_started()
+
+        jobs = [scheduler.submit(order.append, 'bulk', lane='bulk') for _ in range(4)]
+        jobs += [scheduler.submit(order.append, 'interactive', lane='interactive') for _ in range(32)]
+        tasks = [asyncio.ensure_future(job) for job in jobs]
+        await asyncio.sleep(0)
+        gate.release.set()
+        await asyncio.gather(blocked, *tasks)
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    # Poids 8:1 : une passe bulk pour huit passes interactives tant que les deux voies sont chargées
+    for start in range(0, 27, 9):
+        assert order[start:start + 9].count('bulk') == 1
+    assert stats['lanes']['interactive']['processed'] == 32
+    assert stats['lanes']['bulk']['processed'] == 4
+
+
+def test_requete_expiree_abandonnee_avant_la_passe():
+    calls = []
+
+    async def scenario():
+        scheduler = _scheduler()
+        with pytest.raises(DeadlineExceeded):
+            await scheduler.submit(calls.append, 'x', lane='interactive', deadline=time.monotonic() - 1)
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    assert calls == []
+    assert stats['lanes']['interactive']['expired'] == 1
+    assert stats['lanes']['interactive']['processed'] == 0
+
+
+def test_file_pleine():
+    async def scenario():
+        scheduler = _scheduler(max_queue=2)
+        gate = Gate()
+        blocked = asyncio.ensure_future(scheduler.submit(gate, None, lane='gate'))
+        await gate.wait_started()
+
+        queued = [asyncio.ensure_future(scheduler.submit(len, 'ab', lane='bulk')) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull):
+            await scheduler.submit(len, 'ab', lane='bulk')
+        # Les autres voies ne sont pas affectées
+        interactive = asyncio.ensure_future(scheduler.submit(len, 'abc', lane='interactive'))
+        await asyncio.sleep(0)
+
+        gate.release.set()
+        results = await asyncio.gather(*queued, interactive)
+        await blocked
+        return results, scheduler.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == [2, 2, 3]
+    assert stats['lanes']['bulk']['rejected'] == 1
+    assert stats['lanes']['bulk']['processed'] == 2
+
+
+def test_requetes_interactives_servies_entre_les_lots():
+    order = []
+    first_chunk = Gate()
+
+    def predict(chunk):
+        order.append(('bulk', len(chunk)))
+        if not first_chunk.started.is_set():
+            first_chunk(None)
+        return [item * 10 for item in chunk]
+
+    def predict_one(item):
+        order.append(('interactive', 1))
+        return item
+
+    async def scenario():
+        scheduler = _scheduler()
+        batch = asyncio.ensure_future(scheduler.submit_batch(predict, list(range(32)), 8, lane='bulk'))
+        await first_chunk.wait_started()
+
+        interactive = [asyncio.ensure_future(scheduler.submit(predict_one, i, lane='interactive')) for i in range(3)]
+        await asyncio.sleep(0)
+        first_chunk.release.set()
+        return await batch, await asyncio.gather(*interactive)
+
+    batch_results, interactive_results = asyncio.run(scenario())
+    assert batch_results == [i * 10 for i in range(32)]
+    assert interactive_results == [0, 1, 2]
+    assert order == [('bulk', 8)] + [('interactive', 1)] * 3 + [('bulk', 8)] * 3
+
+
+def test_echeance_verifiee_entre_les_lots():
+    chunks = []
+
+    def slow(chunk):
+        chunks.append(chunk)
+        time.sleep(0.05)
+        return chunk
+
+    async def scenario():
+        scheduler = _scheduler()
+        with pytest.raises(DeadlineExceeded):
+            await scheduler.submit_batch(slow, list(range(16)), 4, lane='bulk', deadline=time.monotonic() + 0.02)
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    assert chunks == [[0, 1, 2, 3]]
+    assert stats['lanes']['bulk']['expired'] == 1
+
+
+def test_percentiles_des_temps_d_attente():
+    assert _percentile(range(1, 101), 0.50) == 51
+    assert _percentile(range(1, 101), 0.95) == 96
+    assert _percentile([7.0], 0.95) == 7.0
+
+    scheduler = _scheduler()
+    scheduler._waits['bulk'].extend(float(v) for v in range(1, 101))
+    stats = scheduler.stats()['lanes']
+    assert stats['bulk']['queue_wait_ms'] == {'avg': 50.5, 'p50': 51.0, 'p95': 96.0, 'max': 100.0}
+    assert stats['interactive']['queue_wait_ms'] is None
+
+
+@pytest.mark.parametrize('weight', [0, -1.0])
+def test_poids_invalides_refuses(weight):
+    with pytest.raises(ValueError):
+        InferenceScheduler({'interactive': 8.0, 'bulk': weight}, default_lane='interactive')
+
+
+def test_erreur_inattendue_n_arrete_pas_le_worker():
+    def fails(_):
+        raise RuntimeError("échec du modèle")
+
+    async def scenario():
+        scheduler = _scheduler()
+        with pytest.raises(RuntimeError):
+            await scheduler.submit(fails, None, lane='bulk')
+
+        # Erreur hors de fn (comptabilité de la voie) : seule la requête concernée échoue
+        scheduler.weights['bulk'] = 0
+        with pytest.raises(ZeroDivisionError):
+            await asyncio.wait_for(scheduler.submit(len, 'ab', lane='bulk'), timeout=5)
+        return await asyncio.wait_for(scheduler.submit(len, 'abc', lane='interactive'), timeout=5)
+
+    assert asyncio.run(scenario()) == 3
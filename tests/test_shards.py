@@ -0,0 +1,89 @@
+"""
+Cache de dataset en shards memmap : préparation, relecture et statistiques de tailles
+"""
+
+import json
+import pickle
+
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+Image = pytest.importorskip("PIL.Image")
+
+from src.training.data import IMAGENET_MEAN, IMAGENET_STD
+from src.training.shards import ShardDataset, prepare_subset, summarize_shards
+
+# (classe, largeur, hauteur, niveau de gris)
+IMAGES = [
+    ('NORMAL', 40, 30, 255),
+    ('NORMAL', 64, 48, 255),
+    ('PNEUMONIA', 50, 70, 0),
+    ('PNEUMONIA', 30, 30, 0),
+    ('PNEUMONIA', 80, 60, 0),
+]
+
+
+@pytest.fixture
+def shards(tmp_path):
+    source = tmp_path / 'chest_xray' / 'test'
+    for i, (category, width, height, value) in enumerate(IMAGES):
+        directory = source / category
+        directory.mkdir(parents=True, exist_ok=True)
+        Image.new('L', (width, height), value).save(directory / f'{i}.png')
+    (source / 'NORMAL' / 'notes.txt').write_text("ignoré")
+
+    output = tmp_path / 'shards'
+    index = prepare_subset(str(source), str(output / 'test'), size=32, shard_size=2, workers=1)
+    return output, index
+
+
+def test_index_et_etiquettes(shards):
+    output, index = shards
+    assert index['classes'] == ['NORMAL', 'PNEUMONIA']
+    assert index['image_size'] == 32
+    assert [s['count'] for s in index['shards']] == [2, 2, 1]
+
+    with open(output / 'test' / 'index.json') as f:
+        assert json.load(f) == index
+    sizes = [(m['width'], m['height']) for m in index['samples']]
+    assert sizes == [(w, h) for _, w, h, _ in IMAGES]
+    assert np.load(output / 'test' / 'labels.npy').tolist() == [0, 0, 1, 1, 1]
+
+
+def test_relecture_normalisee(shards):
+    output, _ = shards
+    dataset = ShardDataset(str(output), 'test')
+    assert len(dataset) == len(IMAGES)
+    assert dataset.classes == ['NORMAL', 'PNEUMONIA']
+
+    for idx, (category, _, _, value) in enumerate(IMAGES):
+        image, label = dataset[idx]
+        assert image.shape == (3, 224, 224)
+        assert label == dataset.classes.index(category)
+        expected = torch.tensor([(value / 255 - m) / s for m, s in zip(IMAGENET_MEAN, IMAGENET_STD)])
+        assert torch.allclose(image.mean(dim=(1, 2)), expected, atol=1e-4)
+
+
+def test_memmaps_non_serialises(shards):
+    output, _ = shards
+    dataset = ShardDataset(str(output), 'test')
+    dataset[3]
+    assert dataset._shards is not None
+
+    clone = pickle.loads(pickle.dumps(dataset))
+    assert clone._shards is None
+    assert torch.equal(clone[3][0], dataset[3][0])
+
+
+def test_statistiques_de_tailles(shards):
+    output, _ = shards
+    summary = summarize_shards(str(output))
+    assert set(summary) == {('test', 'NORMAL'), ('test', 'PNEUMONIA')}
+    assert summary[('test', 'NORMAL')] == {
+        'count': 2, 'smallest': (40, 30), 'biggest': (64, 48), 'average': (52.0, 39.0)
+    }
+    assert summary[('test', 'PNEUMONIA')]['count'] == 3
+    assert summary[('test', 'PNEUMONIA')]['smallest'] == (30, 30)
+    assert summary[('test', 'PNEUMONIA')]['biggest'] == (80, 70)